@@ -1,17 +1,25 @@
 """Public API entry-point for mtgdeck."""
+from concurrent.futures import ThreadPoolExecutor
+
+from .compression import (compress, decompress, extension)
+from .bulk import (map_loads, map_dumps)
 
 from .decoder import (DecodeError,
+                      LimitError,
+                      Limits,
                       AutoDecoder,
                       MagicOnlineDecoder,
                       MagicWorkstationDecoder,
                       OCTGNDecoder,
-                      CockatriceDecoder)
+                      CockatriceDecoder,
+                      CompactDecoder)
 
 from .encoder import (EncodeError,
                       MagicOnlineEncoder,
                       MagicWorkstationEncoder,
                       OCTGNEncoder,
-                      CockatriceEncoder)
+                      CockatriceEncoder,
+                      CompactEncoder)
 
 
 __version__ = '0.2.1'
@@ -19,17 +27,23 @@ __author__ = 'Pedro Silva <psilva+git@pedrosilva.pt>'
 __all__ = [
     'load', 'loads',
     'dump', 'dumps',
+    'dump_many', 'dumps_many',
+    'map_loads', 'map_dumps',
     'DecodeError',
+    'LimitError',
+    'Limits',
     'AutoDecoder',
     'MagicOnlineDecoder',
     'MagicWorkstationDecoder',
     'OCTGNDecoder',
     'CockatriceDecoder',
+    'CompactDecoder',
     'EncodeError',
     'MagicOnlineEncoder',
     'MagicWorkstationEncoder',
     'OCTGNEncoder',
     'CockatriceEncoder',
+    'CompactEncoder',
 ]
 
 
@@ -40,8 +54,10 @@ def load(fin, cls=AutoDecoder):
     To use a custom ``MTGDeckDecoder`` subclass, specify it with the ``cls``
     kwarg; otherwise ``AutoDecoder`` is used.
 
+    gzip, bz2 and xz compressed input is decompressed transparently.
+
     """
-    return cls().load(fin)
+    return cls().load(decompress(fin))
 
 
 def loads(string, cls=AutoDecoder):
@@ -55,15 +71,22 @@ def loads(string, cls=AutoDecoder):
     return cls().loads(string)
 
 
-def dump(obj, fout, cls=MagicOnlineEncoder):
+def dump(obj, fout, cls=MagicOnlineEncoder, compression=None):
     """Serialize ``obj`` as a MTG decklist formatted stream to ``fout`` (a
     ``.write()``-supporting file-like object).
 
     To use a custom ``Encoder`` subclass, specify it with the ``cls``
     kwarg; otherwise ``Encoder`` is used.
 
+    To compress the output, set ``compression`` to one of ``gz``, ``bz2`` or
+    ``xz``; otherwise it is inferred from the extension of ``fout.name``.
+
     """
-    return cls().dump(obj, fout)
+    compression = compression or extension(fout)
+    if compression is None:
+        return cls().dump(obj, fout)
+    with compress(fout, compression) as stream:
+        return cls().dump(obj, stream)
 
 
 def dumps(obj, cls=MagicOnlineEncoder):
@@ -74,3 +97,30 @@ def dumps(obj, cls=MagicOnlineEncoder):
 
     """
     return cls().dumps(obj)
+
+
+def dump_many(obj, outputs, compression=None):
+    """Serialize ``obj`` to several MTG decklist formatted streams at once.
+
+    ``outputs`` is a sequence of ``(Encoder subclass, fout)`` pairs. ``obj``
+    is only iterated over once, and the streams are written concurrently.
+    See ``dump()`` for ``compression``.
+
+    """
+    obj = list(obj)
+    with ThreadPoolExecutor(max(len(outputs), 1)) as pool:
+        futures = [pool.submit(dump, obj, fout, cls, compression)
+                   for cls, fout in outputs]
+    for future in futures:
+        future.result()
+
+
+def dumps_many(obj, classes):
+    """Serialize ``obj`` to a list of MTG decklist formatted ``str``, one per
+    ``Encoder`` subclass in ``classes``.
+
+    ``obj`` is only iterated over once.
+
+    """
+    obj = list(obj)
+    return [cls().dumps(obj) for cls in classes]
@@ -1,10 +1,17 @@
 """mtgdeck - MTG deck list decoder and encoder library and application
 
 """
+import os
 import sys
 import argparse
 
 import mtgdeck
+from mtgdeck.compression import CODECS
+from mtgdeck.job import Job
+from mtgdeck.members import (load_members, safe_name)
+from mtgdeck.normalize import normalize
+from mtgdeck.stream import Server
+from mtgdeck.watch import Watcher
 
 
 ENCODECS = {
@@ -13,17 +20,37 @@ ENCODECS = {
                 'text': mtgdeck.MagicOnlineDecoder,
                 'mws': mtgdeck.MagicWorkstationDecoder,
                 'cod': mtgdeck.CockatriceDecoder,
-                'octgn': mtgdeck.OCTGNDecoder},
+                'octgn': mtgdeck.OCTGNDecoder,
+                'bin': mtgdeck.CompactDecoder},
     'encoder': {'default': mtgdeck.MagicOnlineEncoder,
                 'text': mtgdeck.MagicOnlineEncoder,
                 'mws': mtgdeck.MagicWorkstationEncoder,
                 'cod': mtgdeck.CockatriceEncoder,
-                'octgn': mtgdeck.OCTGNEncoder},
+                'octgn': mtgdeck.OCTGNEncoder,
+                'bin': mtgdeck.CompactEncoder},
 }
 
 
-def action(kind):
-    """Return a ClassAction(argparse.Action) for ``kind``."""
+class Choices(object):
+    """Format ``names``, also containing comma-separated lists of them."""
+
+    def __init__(self, names):
+        self.names = names
+
+    def __contains__(self, value):
+        return all(name in self.names for name in value.split(','))
+
+    def __iter__(self):
+        return iter(self.names)
+
+
+def action(kind, many=False):
+    """Return a ClassAction(argparse.Action) for ``kind``.
+
+    If ``many`` is set, comma-separated values are coerced to a list of
+    ``(name, class)``.
+
+    """
 
     class ClassAction(argparse.Action):  # pylint: disable=R0903
         """Map argument string values to a class in module ``kind``.
@@ -32,13 +59,19 @@ def action(kind):
 
         """
         def __init__(self, *args, **kwargs):
-            kwargs['choices'] = ENCODECS[kind].keys()
+            names = ENCODECS[kind].keys()
+            kwargs['choices'] = Choices(names) if many else names
             kwargs['default'] = ENCODECS[kind]['default']
             super(ClassAction, self).__init__(*args, **kwargs)
 
         def __call__(self, parser, namespace, value, option_string=None):
             """Coerce argument value to the appropriate ``kind`` class."""
-            setattr(namespace, self.dest, ENCODECS[kind][value])
+            if many and ',' in value:
+                value = [(name, ENCODECS[kind][name])
+                         for name in value.split(',')]
+            else:
+                value = ENCODECS[kind][value]
+            setattr(namespace, self.dest, value)
 
     return ClassAction
 
@@ -48,23 +81,207 @@ def parse_arguments(argv):
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument('-d', '--decoder', help='decoding format',
                         action=action('decoder'))
-    parser.add_argument('-e', '--encoder', help='encoding format',
-                        action=action('encoder'))
+    parser.add_argument('-e', '--encoder', help='encoding format, or '
+                        'comma-separated formats', action=action('encoder',
+                                                                 many=True))
     parser.add_argument('-i', '--input', help='input file',
                         type=argparse.FileType('r'), default=sys.stdin)
     parser.add_argument('-o', '--output', help='output file',
                         type=argparse.FileType('w'), default=sys.stdout)
-    return parser.parse_args(argv)
+    parser.add_argument('-a', '--archive', help='decode every decklist in a '
+                        'zip or tar archive')
+    parser.add_argument('-t', '--template', help='output file name template '
+                        'for several encoding formats or archive members, '
+                        'with {name}, {format} and {ext} fields (default: '
+                        '%(default)s)', default='{name}{ext}')
+    parser.add_argument('-z', '--compress', help='output compression '
+                        '(default: from the output file extension)',
+                        choices=sorted(CODECS))
+    parser.add_argument('-m', '--merge', help='merge duplicate entries',
+                        action='store_true')
+    parser.add_argument('-s', '--sort', help='sort sections and entries',
+                        action='store_true')
+    parser.add_argument('-w', '--watch', help='keep TARGET in sync with the '
+                        'decklists under SOURCE', nargs=2,
+                        metavar=('SOURCE', 'TARGET'))
+    parser.add_argument('--interval', help='watch polling interval, in '
+                        'seconds', type=float, default=1.0)
+    parser.add_argument('--once', help='sync watched directories once and '
+                        'exit', action='store_true')
+    parser.add_argument('-j', '--job', help='convert the decklist files (or '
+                        'directories) in INPUTS to TARGET, resuming any '
+                        'previous run', metavar='TARGET')
+    parser.add_argument('--root', help='job inputs directory, which outputs '
+                        'mirror (default: the current directory)',
+                        default=os.curdir)
+    parser.add_argument('--every', help='job journal flushing interval, in '
+                        'files', type=int, default=100)
+    parser.add_argument('inputs', help='job input files or directories',
+                        nargs='*', metavar='INPUTS')
+    parser.add_argument('--stream', help='serve framed conversion requests '
+                        'from stdin to stdout', action='store_true')
+    args = parser.parse_args(argv)
+    check_job(parser, args)
+    check_encoders(parser, args)
+    return args
+
+
+def check_encoders(parser, args):
+    """Exit with a usage error if several encoding formats, or an output
+    file, are given where they can not be used.
+
+    """
+    many = isinstance(args.encoder, list)
+    if many and (args.watch or args.job or args.stream):
+        parser.error('several encoding formats are only allowed when '
+                     'converting an input file or an archive')
+    if (many or args.archive) and args.output is not sys.stdout:
+        args.output.close()
+        parser.error('-o/--output can not be used with several encoding '
+                     'formats or -a/--archive: use -t/--template')
+
+
+def check_job(parser, args):
+    """Exit with a usage error on inconsistent job arguments."""
+    if args.inputs and not args.job:
+        parser.error('INPUTS are only allowed with -j/--job')
+    if args.job and not args.inputs:
+        parser.error('-j/--job requires INPUTS')
+    if args.every < 1:
+        parser.error('--every must be at least 1')
+
+
+def watch(args):
+    """Run a watch loop, reporting conversion failures to stderr."""
+    watcher = Watcher(*args.watch, decoder=args.decoder, encoder=args.encoder)
+    for failures in watcher.watch(args.interval, 1 if args.once else None):
+        for name, error in failures:
+            print('{}: {}'.format(name, error), file=sys.stderr)
+
+
+def stream(args):
+    """Serve framed conversion requests from stdin to stdout."""
+    server = Server(ENCODECS['decoder'], ENCODECS['encoder'],
+                    merge=args.merge, sort=args.sort)
+    server.serve(sys.stdin.buffer, sys.stdout.buffer)
+
+
+def encoders(args):
+    """Return the ``(format name, class)`` pairs to encode to."""
+    if isinstance(args.encoder, list):
+        return args.encoder
+    names = [name for name, cls in ENCODECS['encoder'].items()
+             if cls is args.encoder and name != 'default']
+    return [(names[0] if names else 'default', args.encoder)]
+
+
+def output_path(template, **fields):
+    """Return ``template`` formatted with ``fields``.
+
+    Raise ``ValueError`` if the path resolves outside of the directory of
+    the template (ie: the part before the first field).
+
+    """
+    root = os.path.realpath(os.path.dirname(template.split('{', 1)[0]) or
+                            os.curdir)
+    path = template.format(**fields)
+    if os.path.commonpath([root, os.path.realpath(path)]) != root:
+        raise ValueError('Output path outside of {}: {}'.format(root, path))
+    return path
+
+
+def fan_out(args, name, deck):
+    """Encode ``deck`` to each of the encoding formats, to output files
+    named after ``args.template``.
+
+    """
+    paths = [(cls, output_path(args.template, name=name, format=fmt,
+                               ext=cls.extension))
+             for fmt, cls in encoders(args)]
+    outputs = []
+    for cls, path in paths:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        outputs.append((cls, open(path, 'w', encoding='utf-8')))
+    try:
+        mtgdeck.dump_many(deck, outputs, compression=args.compress)
+    finally:
+        for _, fout in outputs:
+            fout.close()
+
+
+def walk(paths):
+    """Yield the files in ``paths``, walking directories."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+        for root, _, files in os.walk(path):
+            for name in files:
+                yield os.path.join(root, name)
+
+
+def job(args):
+    """Run a resumable conversion job, reporting failures to stderr."""
+    work = Job(walk(args.inputs), args.job, args.root, decoder=args.decoder,
+               encoder=args.encoder, every=args.every)
+    work.run()
+    for name, error in sorted(work.journal['failed'].items()):
+        print('{}: {}'.format(name, error), file=sys.stderr)
+
+
+def prepare(args, deck):
+    """Return ``deck``, normalized if requested."""
+    if args.merge or args.sort:
+        return normalize(deck, args.merge, args.sort)
+    return deck
+
+
+def unpack(args):
+    """Decode the members of an archive and encode each to output files
+    named after ``args.template``, reporting failures (and members whose
+    name is unsafe) to stderr.
+
+    """
+    cls = None if args.decoder is mtgdeck.AutoDecoder else args.decoder
+    for name, deck in load_members(args.archive, cls=cls):
+        try:
+            if isinstance(deck, Exception):
+                raise deck
+            fan_out(args, os.path.splitext(safe_name(name))[0],
+                    prepare(args, deck))
+        except Exception as _:  # pylint: disable=W0703
+            print('{}: {}'.format(name, _), file=sys.stderr)
+
+
+def convert(args):
+    """Decode the input and encode it to the output(s)."""
+    deck = prepare(args, mtgdeck.load(args.input, cls=args.decoder))
+    if isinstance(args.encoder, list):
+        name = 'stdin' if args.input is sys.stdin else \
+            os.path.splitext(os.path.basename(args.input.name))[0]
+        fan_out(args, name, deck)
+    else:
+        mtgdeck.dump(deck,
+                     args.output,
+                     cls=args.encoder,
+                     compression=args.compress)
+        args.output.close()
+    args.input.close()
 
 
 def main(argv=None):
     """Run a full encode-decode pipeline."""
     args = parse_arguments(argv)
-    mtgdeck.dump(mtgdeck.load(args.input, cls=args.decoder),
-                 args.output,
-                 cls=args.encoder)
-    args.input.close()
-    args.output.close()
+    if args.watch:
+        watch(args)
+    elif args.stream:
+        stream(args)
+    elif args.archive:
+        unpack(args)
+    elif args.job:
+        job(args)
+    else:
+        convert(args)
     sys.exit(0)
 
 
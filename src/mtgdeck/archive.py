@@ -0,0 +1,193 @@
+"""Random-access deck archives for mtgdeck.
+
+An ``ArchiveWriter`` stores encoded decks back to back, and appends an
+offset index and an optional secondary index by key (ie: a deck id or
+``fingerprint()``) when closed. An ``Archive`` memory-maps the file and
+decodes any single deck without reading the others: the ``i``-th payload
+is found with a single lookup in the offset table, and keys with a binary
+search.
+
+File layout::
+
+    MAGIC | payloads | count + 1 offsets (uint64) |
+    keys * key offset (uint64) | key records |
+    count (uint64) | keys (uint64) | index offset (uint64) | MAGIC
+
+where each key record is ``size (uint32) | key | deck number (uint64)``.
+Key records are sorted by key. All integers are little-endian.
+
+"""
+import mmap
+import struct
+
+from .decoder import AutoDecoder, CompactDecoder
+from .encoder import MagicOnlineEncoder
+
+MAGIC = b'MTGAR\x01'
+_WORD = struct.Struct('<Q')
+_SIZE = struct.Struct('<I')
+_FOOTER = struct.Struct('<QQQ')
+
+
+def _key(key):
+    return key.encode('utf-8') if isinstance(key, str) else bytes(key)
+
+
+class ArchiveWriter(object):
+    """Write decks encoded with ``cls`` to ``fout`` (a binary
+    ``.write()``-supporting file-like object) as an archive.
+
+    Offsets are file positions, so the archive must start the file: raise
+    ``ValueError`` if ``fout`` is not at position 0. The archive is only
+    complete once ``close()`` is called.
+
+    """
+
+    def __init__(self, fout, cls=MagicOnlineEncoder):
+        try:
+            position = fout.tell()
+        except (AttributeError, OSError):
+            position = 0
+        if position:
+            raise ValueError('Archive must start at position 0, not {}'
+                             .format(position))
+        self.fout = fout
+        self.encoder = cls()
+        self.offsets = [len(MAGIC)]
+        self.keys = {}
+        fout.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def add(self, obj, key=None):
+        """Encode and append ``obj`` (a sequence of ``(card name (str),
+        attributes (dict))``), indexed by ``key`` (``str`` or ``bytes``) if
+        given; return its deck number.
+
+        Raise ``KeyError`` if ``key`` is already in the archive. Nothing is
+        added if encoding ``obj`` fails.
+
+        """
+        if key is not None:
+            key = _key(key)
+            if key in self.keys:
+                raise KeyError('Duplicate key {!r}'.format(key))
+
+        payload = self.encoder.dumps(obj)
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        self.fout.write(payload)
+        self.offsets.append(self.offsets[-1] + len(payload))
+        if key is not None:
+            self.keys[key] = len(self) - 1
+        return len(self) - 1
+
+    def close(self):
+        """Write the indexes and footer."""
+        index = self.offsets[-1]
+        for offset in self.offsets:
+            self.fout.write(_WORD.pack(offset))
+
+        records = [_SIZE.pack(len(key)) + key + _WORD.pack(self.keys[key])
+                   for key in sorted(self.keys)]
+        offset = 0
+        for record in records:
+            self.fout.write(_WORD.pack(offset))
+            offset += len(record)
+        for record in records:
+            self.fout.write(record)
+        self.fout.write(_FOOTER.pack(len(self), len(records), index) + MAGIC)
+
+
+class Archive(object):
+    """Memory-mapped, read-only view of the archive at ``path``, decoding
+    decks with ``cls``.
+
+    """
+
+    def __init__(self, path, cls=AutoDecoder):
+        self.path = path
+        self.decoder = cls()
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        end = len(self._map) - len(MAGIC)
+        if (self._map[:len(MAGIC)] != MAGIC or
+                self._map[end:] != MAGIC):
+            self.close()
+            raise ValueError('Not a deck archive: {}'.format(path))
+        self._count, self._keys, self._index = _FOOTER.unpack_from(
+            self._map, end - _FOOTER.size)
+        self._records = self._index + (self._count + 1) * _WORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return self.decoder.loads(self.payload(i))
+
+    def _offset(self, i):
+        return _WORD.unpack_from(self._map, self._index + i * _WORD.size)[0]
+
+    def payload(self, i):
+        """Return the encoded ``i``-th deck, as ``str`` or as ``bytes`` for
+        binary formats.
+
+        """
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('deck number out of range')
+        payload = self._map[self._offset(i):self._offset(i + 1)]
+        if payload.startswith(CompactDecoder.magic):
+            return payload
+        return payload.decode('utf-8')
+
+    def _record(self, i):
+        """Return the key and deck number of the ``i``-th key record."""
+        base = self._records + self._keys * _WORD.size
+        start = base + _WORD.unpack_from(self._map,
+                                         self._records + i * _WORD.size)[0]
+        size = _SIZE.unpack_from(self._map, start)[0]
+        start += _SIZE.size
+        return (self._map[start:start + size],
+                _WORD.unpack_from(self._map, start + size)[0])
+
+    def find(self, key):
+        """Return the deck number for ``key``, or ``None``."""
+        key = _key(key)
+        low, high = 0, self._keys
+        while low < high:
+            mid = (low + high) // 2
+            found, number = self._record(mid)
+            if found == key:
+                return number
+            if found < key:
+                low = mid + 1
+            else:
+                high = mid
+        return None
+
+    def get(self, key, default=None):
+        """Return the decoded deck for ``key``, or ``default``."""
+        number = self.find(key)
+        return default if number is None else self[number]
+
+    def close(self):
+        """Unmap and close the archive file."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = self._map = None
@@ -1,15 +1,158 @@
 """Abstract base decoder classes."""
+import codecs
+import re
+import threading
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
 from io import StringIO
-from defusedxml.ElementTree import parse  # pylint: disable=E0401
+from xml.etree.ElementTree import TreeBuilder, XMLPullParser
+from pyparsing import ParseException, ParserElement
+from defusedxml.ElementTree import (DefusedXMLParser,  # pylint: disable=E0401
+                                    iterparse)
+from ..lazy import LazyDeck
+
+
+COMMENTS = re.compile(r'/\*.*?\*/|//[^\n]*', re.S)
+
+
+_PACKRAT = threading.Lock()
+
+
+@contextmanager
+def packrat(cache_size):
+    """Enable pyparsing packrat memoization within the ``with`` block only.
+
+    The memo holds at most ``cache_size`` entries and is dropped on exit,
+    restoring whatever memoization settings were in place before. A
+    ``cache_size`` of ``0`` leaves pyparsing untouched.
+
+    Pyparsing memoization is process-wide: it cannot be limited to mtgdeck
+    grammars. While a block runs, every pyparsing parse in the process,
+    in other threads or outside of mtgdeck, memoizes too, against a memo
+    that is not thread-safe. Blocks are serialized by a lock so that their
+    settings are always restored; parses outside of any block are not.
+
+    """
+    if not cache_size:
+        yield
+        return
+
+    # pylint: disable=W0212
+    with _PACKRAT:
+        saved = (ParserElement._packratEnabled,
+                 ParserElement._parse,
+                 ParserElement.packrat_cache)
+        ParserElement._packratEnabled = False
+        ParserElement.enablePackrat(cache_size)
+        try:
+            yield
+        finally:
+            ParserElement.resetCache()
+            (ParserElement._packratEnabled,
+             ParserElement._parse,
+             ParserElement.packrat_cache) = saved
+
+
+class LimitError(ValueError):
+    """Decoding limit exceeded exception."""
+
+    def __str__(self):
+        return 'Decoding limit exceeded: {}'.format(self.args)
+
+
+class Limits(object):
+    """Resource limits for decoding untrusted input.
+
+    Each limit is either ``None`` (unlimited) or the maximum input length,
+    number of entries, line length, card count and nesting depth (of set id
+    brackets, or XML elements) allowed. Decoders raise ``LimitError`` as
+    soon as one of them is exceeded.
+
+    """
+
+    def __init__(self, max_bytes=None, max_entries=None, max_line=None,
+                 max_count=None, max_nesting=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_line = max_line
+        self.max_count = max_count
+        self.max_nesting = max_nesting
+
+    def check(self, limit, value):
+        """Raise ``LimitError`` if ``value`` exceeds ``limit`` (ie:
+        ``'max_entries'``).
+
+        """
+        maximum = getattr(self, limit)
+        if maximum is not None and value > maximum:
+            raise LimitError(limit, maximum, value)
+
+    def check_input(self, string):
+        """Check the length of ``string``, and of its longest line if it is a
+        ``str``.
+
+        """
+        self.check('max_bytes', len(string))
+        if self.max_line is None or not isinstance(string, str):
+            return
+        line = re.search('[^\n]{{{},}}'.format(self.max_line + 1), string)
+        if line:
+            self.check('max_line', len(line.group()))
+
+
+_LIMITING = threading.local()
+
+
+@contextmanager
+def limiting(limits):
+    """Enforce ``limits`` in ``limited`` parse actions within the ``with``
+    block, in the current thread.
+
+    """
+    _LIMITING.limits, _LIMITING.entries = limits, 0
+    try:
+        yield
+    finally:
+        _LIMITING.limits = None
+
+
+def limited(string, loc, tokens):  # pylint: disable=W0613
+    """Pyparsing parse action checking an entry count token against the
+    active ``limiting()`` limits, as it is parsed.
+
+    It takes the full ``(string, loc, tokens)`` arguments: pyparsing guesses
+    the arity of shorter parse actions on their first call, which is not
+    thread-safe.
+
+    """
+    limits = getattr(_LIMITING, 'limits', None)
+    if limits is not None:
+        _LIMITING.entries += 1
+        limits.check('max_entries', _LIMITING.entries)
+        limits.check('max_count', int(tokens[0]))
+
+
+def nesting(string, opener='[', closer=']'):
+    """Return the maximum nesting depth of brackets in ``string``."""
+    depth = deepest = 0
+    for match in re.finditer(re.escape(opener) + '|' + re.escape(closer),
+                             string):
+        depth += 1 if match.group() == opener else -1
+        deepest = max(deepest, depth)
+    return deepest
 
 
 class Decoder(metaclass=ABCMeta):
     """Abstract base class for decoders.
 
-    Decoders are expected to implement a single method, ``_decode()``.
+    Decoders are expected to implement a single method, ``_decode()``, and
+    may override ``sniff()`` to reject foreign input early.
+
+    Set ``limits`` to a ``Limits`` instance to decode untrusted input.
 
     """
+    limits = Limits()
+
     @abstractmethod
     def _decode(self, string):
         """Decode ``string`` into an internal representation format.
@@ -20,30 +163,71 @@ class Decoder(metaclass=ABCMeta):
 
         return []
 
+    def sniff(self, string):
+        """Check that the head of ``string`` can belong to this format.
+
+        Raise the same exception ``_decode()`` would, but after looking at no
+        more than the first line or token of ``string``, so that decoding
+        foreign input fails fast.
+
+        """
+
+    def parser(self):
+        """Return a push parser (see ``PushParser``) decoding with this
+        decoder.
+
+        By default, input is buffered and decoded once the parser is closed
+        (see ``BufferedPushParser``).
+
+        """
+        return BufferedPushParser(self)
+
     def load(self, fin):
         """Deserialize ``fin`` (a ``.read()``-supporting file-like object
         containing an MTG decklist) to a Python object.
 
         """
-        return self.loads(fin.read())
+        return self.loads(self._read(fin))
+
+    def _read(self, fin):
+        """Read ``fin``, stopping just past the ``max_bytes`` limit."""
+        limit = self.limits.max_bytes
+        return fin.read(-1 if limit is None else limit + 1)
 
     def loads(self, string):
         """Deserialize ``string`` (a ``str``, ``bytes`` or ``bytearray`` instance
         containing an MTG decklist) to a Python object.
 
         """
+        self.limits.check_input(string)
         src = string.replace('\r\n', '\n').replace('\r', '\n')
+        self.sniff(src)
         return list(self._decode(src))
 
 
 class TextDecoder(Decoder):
     """Abstract base class for text-based decoders.
 
-    Decoders are expected to set the ``deck`` property, and override the
-    ``decode_entry`` method.
+    Decoders are expected to set the ``line`` and ``deck`` properties, and
+    override the ``decode_entry`` method.
+
+    Set ``packrat`` to a positive cache size to parse with a bounded packrat
+    memo. It is off by default: line-oriented grammars never backtrack far
+    enough to benefit from it, and the memo is process-wide (see
+    ``packrat()``).
+
+    Decoders may set ``pattern`` to support ``loads_lazy()``.
 
     """
 
+    packrat = 0
+    pattern = None
+
+    @property
+    @abstractmethod
+    def line(self):
+        """Pyparsing parser for a single comment, section or entry."""
+
     @property
     @abstractmethod
     def deck(self):
@@ -64,14 +248,72 @@ class TextDecoder(Decoder):
 
         """
 
-    def _decode(self, string):
-        """Decode ``string``, yielding (card name (str), attributes (dict))."""
-        entries = self.deck.parseString(string, parseAll=True)
+    def _lines(self, string):
+        """Yield ``pattern`` matches for each consecutive line of ``string``.
+        """
+        pos = 0
+        while pos < len(string):
+            match = self.pattern.match(string, pos)
+            if match is None:
+                raise ParseException(string, pos, 'Expected a line')
+            pos = match.end()
+            yield match
+
+    def loads_lazy(self, string):
+        """Deserialize ``string`` (a ``str`` instance containing an MTG
+        decklist) to a ``LazyDeck`` over the normalized string.
+
+        Lines are matched with ``pattern``: a regular expression for a
+        comment, section or entry line, with ``count`` and ``name`` groups
+        for entries, and ``section`` and ``setid`` groups where the format
+        has them. Unlike ``loads()``, entries must be one per line.
+
+        """
+        self.limits.check_input(string)
+        deck = LazyDeck(string.replace('\r\n', '\n').replace('\r', '\n'))
+        sideboard = False
+        for match in self._lines(deck.buffer):
+            if match.group('count') is None:
+                sideboard = sideboard or bool(match.group('section'))
+                continue
+            self.limits.check('max_entries', len(deck) + 1)
+            deck.append(match, sideboard or bool(match.group('section')))
+            self.limits.check('max_count', deck.counts[-1])
+        return deck
+
+    def reset(self):
+        """Reset the decoding state (ie: the current section) before a new
+        deck.
+
+        """
+
+    def sniff(self, string):
+        """Raise ``ParseException`` unless ``string`` opens with a line."""
+        with packrat(self.packrat):
+            self.line.parseString(string)
+
+    def parser(self):
+        return TextPushParser(self)
+
+    def decode_lines(self, string):
+        """Decode ``string`` (whole lines of a deck), yielding (card name
+        (str), attributes (dict)), without resetting the decoding state.
+
+        """
+        if self.limits.max_nesting is not None:
+            self.limits.check('max_nesting', nesting(string))
+        with packrat(self.packrat), limiting(self.limits):
+            entries = self.deck.parseString(string, parseAll=True)
 
         for entry in (self.decode_entry(e) for e in entries):
             if entry:
                 yield entry
 
+    def _decode(self, string):
+        """Decode ``string``, yielding (card name (str), attributes (dict))."""
+        self.reset()
+        return self.decode_lines(string)
+
 
 class XMLDecoder(Decoder):
     """Abstract base class for XML-based decoders.
@@ -96,16 +338,268 @@ class XMLDecoder(Decoder):
     def count(self):
         """Quantity (ie: qty, number) tag for the XML decoding format."""
 
+    def _check_root(self, tag):
+        """Raise ``KeyError`` if ``tag`` is not the expected root tag."""
+        if tag != self.root:
+            raise KeyError('Missing a "{}" tag, found "{}"'.format(
+                self.root, tag))
+
+    def sniff(self, string):
+        """Raise ``ParseError`` or ``KeyError`` unless ``string`` opens with
+        the expected root tag.
+
+        Only the first start event is pulled from the parser, which reads a
+        single buffer-sized chunk of ``string``.
+
+        """
+        _, root = next(iterparse(StringIO(string), events=('start',)))
+        self._check_root(root.tag)
+
+    def parser(self):
+        return XMLPushParser(self)
+
+    def cards(self, events, path):
+        """Follow ``events`` (``start`` and ``end`` parser events after the
+        root start tag) down ``path`` (open elements, from the root),
+        checking the nesting limit, and yield ``(section, card)`` elements
+        as cards close.
+
+        """
+        for event, element in events:
+            if event == 'start':
+                path.append(element)
+                self.limits.check('max_nesting', len(path))
+                continue
+            path.pop()
+            if len(path) == 2 and path[1].tag == self.section and \
+                    element.tag == 'card':
+                yield path[1], element
+
+    def decode_card(self, section, card):
+        """Return (card name (str), attributes (dict)) from the ``card``
+        element in ``section``.
+
+        """
+        count = int(card.attrib[self.count])
+        self.limits.check('max_count', count)
+        return card.attrib.get('name', card.text), {
+            'section': section.attrib['name'], 'count': count}
+
     def _decode(self, string):
         """Decode ``string``, yielding (card name (str), attributes (dict))."""
-        tree = parse(StringIO(string))
-
-        if tree.getroot().tag != self.root:
+        events = iterparse(StringIO(string), events=('start', 'end'))
+        _, root = next(events, (None, None))
+        if root is None:
             raise KeyError('Missing a "{}" tag'.format(self.root))
+        self._check_root(root.tag)
+        for entries, card in enumerate(self.cards(events, [root]), 1):
+            self.limits.check('max_entries', entries)
+            yield self.decode_card(*card)
+
+
+class BinaryDecoder(Decoder):
+    """Abstract base class for binary decoders.
+
+    Decoders are expected to set the ``magic`` property, and implement
+    ``_decode()`` over ``bytes``.
+
+    """
+
+    @property
+    @abstractmethod
+    def magic(self):
+        """Leading bytes identifying the binary decoding format."""
+
+    def sniff(self, string):
+        """Raise ``KeyError`` unless ``string`` starts with ``magic``."""
+        if (isinstance(string, str) or
+                bytes(string[:len(self.magic)]) != self.magic):
+            raise KeyError('Missing a {!r} header'.format(self.magic))
+
+    def load(self, fin):
+        """Deserialize ``fin`` (a ``.read()``-supporting binary file-like
+        object) to a Python object.
+
+        Text streams are read from their underlying binary buffer.
+
+        """
+        return self.loads(self._read(getattr(fin, 'buffer', fin)))
+
+    def loads(self, string):
+        """Deserialize ``string`` (a ``bytes`` or ``bytearray`` instance
+        containing an MTG decklist) to a Python object.
+
+        Raise ``ValueError`` if the payload is truncated or corrupt.
+
+        """
+        self.limits.check_input(string)
+        self.sniff(string)
+        try:
+            return list(self._decode(bytes(string)))
+        except (IndexError, UnicodeDecodeError) as _:
+            raise ValueError('Corrupt {!r} payload'.format(self.magic)) from _
+
+
+class PushParser(metaclass=ABCMeta):
+    """Abstract base class for push parsers, decoding a deck with
+    ``decoder`` as it is fed in chunks, in the spirit of ``XMLPullParser``.
+
+    Parsers are expected to implement ``_feed()``, and may override
+    ``_text()`` to receive chunks other than as text.
+
+    """
+
+    def __init__(self, decoder):
+        self.decoder = decoder
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._entries = []
+        self._size = self._count = 0
+        self._closed = False
+
+    @abstractmethod
+    def _feed(self, text, final):
+        """Parse ``text``, the next chunk of the normalized input, emitting
+        complete entries; ``final`` is set for the last chunk.
+
+        """
+
+    def _text(self, chunk, final=False):
+        """Return ``chunk`` (``str``, or UTF-8 ``bytes``, cut anywhere) as
+        text.
+
+        """
+        if isinstance(chunk, str):
+            return chunk
+        return self._utf8.decode(chunk, final)
+
+    def _emit(self, entry):
+        """Make ``entry`` available to ``read_entries()``."""
+        self._count += 1
+        self.decoder.limits.check('max_entries', self._count)
+        self._entries.append(entry)
+
+    def feed(self, chunk):
+        """Feed ``chunk`` (``str``, or UTF-8 ``bytes`` or ``bytearray``, cut
+        anywhere) to the parser.
+
+        """
+        if self._closed:
+            raise ValueError('feed() after close()')
+        self._size += len(chunk)
+        self.decoder.limits.check('max_bytes', self._size)
+        self._feed(self._text(chunk), False)
+
+    def read_entries(self):
+        """Return the list of (card name (str), attributes (dict)) completed
+        since the last call.
+
+        """
+        entries, self._entries = self._entries, []
+        return entries
+
+    def close(self):
+        """Signal the end of the input, raising the exception ``loads()``
+        would if it is not a complete deck.
+
+        The last entries remain available to ``read_entries()``.
+
+        """
+        if not self._closed:
+            self._closed = True
+            self._feed(self._text(b'', final=True), True)
+
+
+class BufferedPushParser(PushParser):
+    """Push parser for decoders that can not decode incrementally (ie:
+    binary formats): chunks are buffered as they are fed, and decoded with
+    ``loads()`` once the parser is closed.
+
+    """
+
+    def __init__(self, decoder):
+        super(BufferedPushParser, self).__init__(decoder)
+        self._chunks = []
+
+    def _text(self, chunk, final=False):
+        return chunk
+
+    def _feed(self, text, final):
+        if text:
+            self._chunks.append(text)
+        if final:
+            data = self._chunks[0][:0].join(self._chunks) if self._chunks \
+                else b''
+            self._chunks = []
+            for entry in self.decoder.loads(data):
+                self._emit(entry)
+
+
+class TextPushParser(PushParser):
+    """Push parser for text-based decoders.
+
+    Input is parsed as soon as lines are complete, except for lines in a
+    block comment still open, and lines holding nothing but comments are
+    skipped. Line ends are normalized across chunks.
+
+    """
+
+    def __init__(self, decoder):
+        super(TextPushParser, self).__init__(decoder)
+        self._pending = ''
+        self._started = False
+        decoder.reset()
+
+    @staticmethod
+    def _cut(data):
+        """Return the length of the leading whole lines of ``data`` that are
+        not in an open block comment.
+
+        """
+        cut = data.rfind('\n') + 1
+        start = data.rfind('/*', 0, cut)
+        if start > data.rfind('*/', 0, cut):
+            cut = data.rfind('\n', 0, start) + 1
+        return cut
+
+    def _feed(self, text, final):
+        data = self._pending + text
+        hold = '\r' if data.endswith('\r') and not final else ''
+        data = data[:len(data) - len(hold)]
+        data = data.replace('\r\n', '\n').replace('\r', '\n')
+
+        cut = len(data) if final else self._cut(data)
+        lines, self._pending = data[:cut], data[cut:] + hold
+        if self.decoder.limits.max_line is not None:
+            self.decoder.limits.check_input(self._pending)
+        if COMMENTS.sub('', lines).strip() or (final and not self._started):
+            self._started = True
+            for entry in self.decoder.decode_lines(lines):
+                self._emit(entry)
+
+
+class XMLPushParser(PushParser):
+    """Push parser for XML-based decoders, on top of ``XMLPullParser`` with
+    a defused expat parser.
+
+    """
 
-        for section in tree.findall(self.section):
-            for entry in section.findall('card'):
-                count = entry.attrib[self.count]
-                card = entry.attrib.get('name', entry.text)
-                yield card, {'section': section.attrib['name'],
-                             'count': int(count)}
+    def __init__(self, decoder):
+        super(XMLPushParser, self).__init__(decoder)
+        self._parser = XMLPullParser(
+            events=('start', 'end'),
+            _parser=DefusedXMLParser(target=TreeBuilder()))
+        self._path = None
+
+    def _feed(self, text, final):
+        self._parser.feed(text)
+        if final:
+            self._parser.close()
+        events = self._parser.read_events()
+        if self._path is None:
+            _, root = next(events, (None, None))
+            if root is None:
+                return
+            self.decoder._check_root(root.tag)  # pylint: disable=W0212
+            self._path = [root]
+        for card in self.decoder.cards(events, self._path):
+            self._emit(self.decoder.decode_card(*card))
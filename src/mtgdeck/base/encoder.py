@@ -1,14 +1,22 @@
 """Abstract base encoder classes."""
 from abc import ABCMeta, abstractmethod
 from xml.etree.ElementTree import Element, SubElement, tostring  # nosec
+from ..normalize import normalize
 
 
 class Encoder(metaclass=ABCMeta):
     """Abstract base class for encoders.
 
-    Encoders are expected to implement a single method, ``_encode()``.
+    Encoders are expected to implement a single method, ``_encode()``, and
+    set the ``extension`` (ie: ``.txt``) commonly used for the format.
+
+    Set ``merge`` to add up the counts of duplicate entries, and ``sort`` to
+    sort sections and entries canonically, before encoding.
 
     """
+    extension = ''
+    merge = False
+    sort = False
 
     @abstractmethod
     def _encode(self, obj):
@@ -30,6 +38,8 @@ class Encoder(metaclass=ABCMeta):
 
     def dumps(self, obj):
         """Serialize ``obj`` to a MTG decklist formatted ``str``."""
+        if self.merge or self.sort:
+            obj = normalize(obj, self.merge, self.sort)
         return self._encode(obj)
 
 
@@ -55,6 +65,32 @@ class TextEncoder(Encoder):
         return out
 
 
+class BinaryEncoder(Encoder):
+    """Abstract base class for binary encoders.
+
+    Encoders are expected to set the ``magic`` property, and implement
+    ``_encode()`` returning ``bytes``.
+
+    """
+
+    @property
+    @abstractmethod
+    def magic(self):
+        """Leading bytes identifying the binary encoding format."""
+
+    def dump(self, obj, fout):
+        """Serialize ``obj`` as a MTG decklist formatted stream to ``fout`` (a
+        ``.write()``-supporting binary file-like object).
+
+        Text streams are written to through their underlying binary buffer.
+
+        """
+        if hasattr(fout, 'buffer'):
+            fout.flush()
+            fout = fout.buffer
+        fout.write(self.dumps(obj))
+
+
 class XMLEncoder(Encoder):
     """Abstract base class for XML-based encoders.
 
@@ -0,0 +1,141 @@
+"""Bulk decoding and encoding for mtgdeck.
+
+Inputs are grouped in chunks, so that each task sent to a worker carries
+many decks, and results are yielded back in input order. Chunks are
+submitted as results are consumed, a bounded window of them ahead, so
+that large inputs are never held in memory at once. A failure to decode
+or encode one input does not abort the batch: its exception is yielded in
+place of the result.
+
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+
+from .decoder import AutoDecoder
+from .encoder import MagicOnlineEncoder
+
+EXECUTORS = {'serial': None,
+             'thread': ThreadPoolExecutor,
+             'process': ProcessPoolExecutor}
+
+
+def _call(func, chunk):
+    """Return ``func(item)``, or the exception it raised, for each item in
+    ``chunk``.
+
+    """
+    results = []
+    for item in chunk:
+        try:
+            results.append(func(item))
+        except Exception as _:  # pylint: disable=W0703
+            results.append(_)
+    return results
+
+
+def chunked(items, size):
+    """Yield lists of up to ``size`` consecutive items from ``items``."""
+    items = iter(items)
+    chunk = list(islice(items, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, size))
+
+
+def window_size(window, workers):
+    """Return ``window``, or twice the number of ``workers`` (or CPUs) if it
+    is ``None``; raise ``ValueError`` if it is less than 1.
+
+    """
+    if window is None:
+        window = 2 * (workers or os.cpu_count() or 1)
+    if window < 1:
+        raise ValueError('Invalid window: {}'.format(window))
+    return window
+
+
+def ordered(pool, task, chunks, window, discard=None):
+    """Submit ``chunks`` to ``pool``, at most ``window`` pending at a time;
+    yield their results in order.
+
+    If the iteration stops early, pending futures are cancelled, and then
+    passed on to ``discard``, if set, to release the results of those that
+    could not be.
+
+    """
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(task, chunk))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if discard is not None:
+            discard(pending)
+
+
+def _imap(func, chunks, executor, workers, window):
+    if executor is None:
+        for chunk in map(partial(_call, func), chunks):
+            yield from chunk
+        return
+
+    with executor(workers) as pool:
+        for chunk in ordered(pool, partial(_call, func), chunks, window):
+            yield from chunk
+
+
+def imap(func, items, executor='process', workers=None, chunksize=256,
+         window=None):
+    """Return an iterator over ``func(item)`` for each of ``items``, in order,
+    or the exception it raised.
+
+    ``executor`` is one of ``process``, ``thread`` or ``serial`` (in the
+    calling thread, for debugging), running ``workers`` workers (by default,
+    as many as the executor sees fit). Items are sent to workers
+    ``chunksize`` at a time, and at most ``window`` chunks (by default, twice
+    the number of workers) are pending at once: ``items`` is consumed as
+    results are. With ``process``, ``func`` and the items must be picklable.
+
+    """
+    if executor not in EXECUTORS:
+        raise ValueError('Unknown executor: {}'.format(executor))
+    return _imap(func, chunked(items, chunksize), EXECUTORS[executor],
+                 workers, window_size(window, workers))
+
+
+def _loads(cls, string):
+    return cls().loads(string)
+
+
+def _dumps(cls, obj):
+    return cls().dumps(obj)
+
+
+def map_loads(strings, cls=AutoDecoder, **kwargs):
+    """Deserialize each of ``strings`` (containing MTG decklists) to a Python
+    object, returning an iterator over them in order.
+
+    A deck that fails to decode yields its exception instead. ``kwargs`` are
+    passed on to ``imap()``.
+
+    """
+    return imap(partial(_loads, cls), strings, **kwargs)
+
+
+def map_dumps(objs, cls=MagicOnlineEncoder, **kwargs):
+    """Serialize each of ``objs`` to a MTG decklist formatted ``str``,
+    returning an iterator over them in order.
+
+    A deck that fails to encode yields its exception instead. ``kwargs`` are
+    passed on to ``imap()``.
+
+    """
+    return imap(partial(_dumps, cls), objs, **kwargs)
@@ -0,0 +1,160 @@
+"""Memory-mapped card database for mtgdeck.
+
+A card database is a sorted string table written once by ``dump()`` and
+queried through ``CardDatabase``. The file is only memory-mapped on first
+use and never parsed as a whole: each lookup is a binary search over a
+fixed-width offset table, so opening a database is nearly free, and the
+mapped pages are shared by every process reading the same file.
+
+File layout::
+
+    MAGIC | count (uint64) | count * offset (uint64) | records
+
+where each record is ``key \\t metadata (JSON) \\n``, ``key`` being the
+case-folded, UTF-8 encoded card name. Records are sorted by ``key``.
+
+"""
+import json
+import mmap
+import struct
+
+MAGIC = b'MTGDB\x01'
+_WORD = struct.Struct('<Q')
+_HEADER = len(MAGIC) + _WORD.size
+
+
+def _key(name):
+    return name.casefold().encode('utf-8')
+
+
+def dump(cards, fout):
+    """Serialize ``cards`` as a card database to ``fout`` (a binary
+    ``.write()``-supporting file-like object).
+
+    ``cards`` is a mapping of canonical card name to a metadata ``dict``
+    (ie: ``setid``, ``legality``) as found in common card JSON dumps.
+
+    """
+    records = sorted(
+        (_key(name), json.dumps(dict(meta, name=name),
+                                separators=(',', ':')).encode('utf-8'))
+        for name, meta in cards.items())
+
+    fout.write(MAGIC + _WORD.pack(len(records)))
+    offset = 0
+    for key, meta in records:
+        fout.write(_WORD.pack(offset))
+        offset += len(key) + len(meta) + 2
+    for key, meta in records:
+        fout.write(key + b'\t' + meta + b'\n')
+
+
+class CardDatabase(object):
+    """Lazily memory-mapped, read-only view of a card database at ``path``.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._size = 0
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return self._open()
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def _open(self):
+        """Map the database file on first use and return its entry count."""
+        if self._map is None:
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+            if self._map[:len(MAGIC)] != MAGIC:
+                self.close()
+                raise ValueError('Not a card database: {}'.format(self.path))
+            self._size = _WORD.unpack_from(self._map, len(MAGIC))[0]
+        return self._size
+
+    def _record(self, i):
+        """Return the absolute offset of the ``i``-th record."""
+        base = _HEADER + self._size * _WORD.size
+        return base + _WORD.unpack_from(self._map, _HEADER + i * _WORD.size)[0]
+
+    def _find(self, key):
+        """Binary search for ``key``; return its record offset or ``None``."""
+        low, high = 0, self._open()
+        while low < high:
+            mid = (low + high) // 2
+            start = self._record(mid)
+            found = self._map[start:self._map.find(b'\t', start)]
+            if found == key:
+                return start + len(key) + 1
+            if found < key:
+                low = mid + 1
+            else:
+                high = mid
+        return None
+
+    def get(self, name, default=None):
+        """Return the metadata ``dict`` for card ``name`` (matched
+        case-insensitively), or ``default`` if it is not in the database.
+
+        The canonical card name is available under the ``name`` key.
+
+        """
+        start = self._find(_key(name))
+        if start is None:
+            return default
+        end = self._map.find(b'\n', start)
+        return json.loads(self._map[start:end].decode('utf-8'))
+
+    def close(self):
+        """Unmap and close the database file."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = self._map = None
+
+
+def enrich(obj, database, fields=('setid',), strict=False):
+    """Yield the entries in ``obj`` validated against ``database``.
+
+    ``obj`` is a sequence of ``(card name (str), attributes (dict))``. Known
+    cards get their canonical name, and any of ``fields`` missing from their
+    attributes is filled in from the database. Unknown cards are passed
+    through unchanged, unless ``strict`` is set, in which case a
+    ``KeyError`` is raised.
+
+    """
+    for name, attrs in obj:
+        meta = database.get(name)
+        if meta is None and strict:
+            raise KeyError('Unknown card "{}"'.format(name))
+        yield _enrich_entry(name, attrs, meta, fields)
+
+
+def _enrich_entry(name, attrs, meta, fields):
+    """Return ``(name, attrs)`` completed from ``meta``, if any."""
+    if meta is None:
+        return name, attrs
+
+    attrs = dict(attrs)
+    for field in fields:
+        if field in meta:
+            attrs.setdefault(field, meta[field])
+    return meta['name'], attrs
@@ -0,0 +1,107 @@
+"""Transparent stream compression for mtgdeck.
+
+Compressed input is recognized by its leading magic bytes (or, for streams
+that cannot be peeked at, by file name extension) and decompressed on the
+fly. Output is compressed according to an explicit method or the output
+file name extension. Only standard library codecs are used, and nothing is
+ever written to temporary files.
+
+"""
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+CODECS = {'gz': gzip, 'bz2': bz2, 'xz': lzma}
+MAGIC = ((b'\x1f\x8b', 'gz'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'xz'))
+
+
+def _raw(stream):
+    """Return the binary stream underlying ``stream``."""
+    return getattr(stream, 'buffer', stream)
+
+
+def _peek(raw, size):
+    """Return up to ``size`` leading bytes of ``raw``, without consuming
+    them, or ``None`` if ``raw`` can neither be peeked at nor rewound.
+
+    """
+    if hasattr(raw, 'peek'):
+        return raw.peek(size)[:size]
+    if raw.seekable():
+        pos = raw.tell()
+        head = raw.read(size)
+        raw.seek(pos)
+        return head
+    return None
+
+
+def peek(fin, size):
+    """Return up to ``size`` leading bytes of the binary stream underlying
+    ``fin``, without consuming them, or ``None`` if it can neither be peeked
+    at nor rewound.
+
+    """
+    return _peek(_raw(fin), size)
+
+
+def _text(binary, stream):
+    """Wrap ``binary`` in a text stream using the encoding of ``stream``, or
+    UTF-8.
+
+    """
+    return io.TextIOWrapper(binary,
+                            encoding=getattr(stream, 'encoding', None) or
+                            'utf-8')
+
+
+def extension(stream):
+    """Return the compression method implied by the name of ``stream``, or
+    ``None``.
+
+    """
+    _, ext = os.path.splitext(str(getattr(stream, 'name', '')))
+    return ext[1:] if ext[1:] in CODECS else None
+
+
+def detect(fin):
+    """Return the compression method (ie: ``gz``, ``bz2``, ``xz``) of
+    ``fin`` (a ``.read()``-supporting file-like object), or ``None``.
+
+    The method is read from the magic bytes of ``fin``; the file name
+    extension is only used for streams that cannot be peeked at.
+
+    """
+    head = peek(fin, 6)
+    if head is None:
+        return extension(fin)
+    for magic, method in MAGIC:
+        if isinstance(head, bytes) and head.startswith(magic):
+            return method
+    return None
+
+
+def decompress(fin):
+    """Return ``fin``, decompressing on the fly if it is compressed.
+
+    Compressed streams are returned as text streams (using the encoding of
+    ``fin``, or UTF-8), with the decompressed bytes available as ``.buffer``.
+
+    """
+    method = detect(fin)
+    if method is None:
+        return fin
+    return _text(CODECS[method].open(_raw(fin), 'rb'), fin)
+
+
+def compress(fout, method):
+    """Return a text stream compressing to ``fout`` with ``method``.
+
+    Closing the returned stream finishes the compressed stream, but leaves
+    ``fout`` open.
+
+    """
+    if hasattr(fout, 'buffer'):
+        fout.flush()
+    return _text(CODECS[method].open(_raw(fout), 'wb'), fout)
@@ -1,11 +1,18 @@
 """Decoder implementations for mtgdeck."""
-from pyparsing import (Group, Keyword, OneOrMore, Optional, ParserElement,
-                       ParseException, Word, cppStyleComment, empty,
+import re
+from pyparsing import (Group, Keyword, Literal, OneOrMore, Optional,
+                       ParseException, Regex, Word, cppStyleComment, empty,
                        nestedExpr, nums, restOfLine)
 from defusedxml.ElementTree import ParseError
-from .base.decoder import (Decoder, TextDecoder, XMLDecoder)
+from .base.decoder import (BinaryDecoder, Decoder, PushParser, TextDecoder,
+                           XMLDecoder, limited)
+from .base.decoder import (LimitError, Limits)  # pylint: disable=W0611
+from .compression import peek
 
-ParserElement.enablePackrat()
+
+# A bracketed set id, without its surrounding blanks. Set ids may not nest,
+# and entries may not list several: a name may not start with a bracket.
+_SETID = r'\[[ \t]*(?P<setid>[^\[\]\n]*?)[ \t]*\]'
 
 
 class DecodeError(Exception):
@@ -26,6 +33,20 @@ class AutoDecoder(Decoder):
     def _decode(self, string):
         """No-op. Instead, concrete class ``_decode()`` methods are used."""
 
+    def load(self, fin):
+        """Deserialize ``fin`` (a ``.read()``-supporting file-like object) to
+        a Python object.
+
+        Binary input is recognized by the magic bytes of the stream
+        underlying ``fin``, and read from it as ``bytes``; anything else is
+        read as text.
+
+        """
+        raw = getattr(fin, 'buffer', fin)
+        if peek(raw, len(CompactDecoder.magic)) == CompactDecoder.magic:
+            return self.loads(self._read(raw))
+        return super(AutoDecoder, self).load(fin)
+
     def loads(self, string):
         """Try to decode ``string`` with different decoders.
 
@@ -33,25 +54,41 @@ class AutoDecoder(Decoder):
 
         """
         exceptions = []
-        for cls in (MagicOnlineDecoder, MagicWorkstationDecoder,
-                    OCTGNDecoder, CockatriceDecoder):
+        for cls in (CompactDecoder, MagicOnlineDecoder,
+                    MagicWorkstationDecoder, OCTGNDecoder, CockatriceDecoder):
             try:
-                return cls().loads(string)
+                decoder = cls()
+                decoder.limits = self.limits
+                return decoder.loads(string)
             except (KeyError, ParseError, ParseException) as _:
                 exceptions.append((cls, _))
         raise DecodeError(exceptions)
 
+    def parser(self):
+        return AutoPushParser(self)
+
 
 class MagicOnlineDecoder(TextDecoder):
     """Decoding class for the simple text format."""
 
     comment = cppStyleComment
     section = Group(Keyword('Sideboard'))
-    count = Word(nums)
+    count = Word(nums).setParseAction(limited)
     card = empty + restOfLine
     setid = nestedExpr('[', ']')
     entry = Group(count + card)
-    deck = OneOrMore(comment | section | entry).ignore(comment)
+    line = comment | section | entry
+    deck = OneOrMore(line).ignore(comment)
+    pattern = re.compile(r'''[ \t]*(?:
+        (?P<section>Sideboard)(?![\w$])[ \t]*(?:\n|\Z) |
+        (?P<count>\d+)[ \t]*(?P<name>[^\n]*)(?:\n|\Z) |
+        //[^\n]*(?:\n|\Z) |
+        /\*(?:[^*]|\*(?!/))*\*/ |
+        \n|\Z)''', re.X)
+
+    def reset(self):
+        """Start out in the main deck."""
+        setattr(self, 'sideboard', False)
 
     def decode_entry(self, entry):
         """Return (card name (str), attributes (dict)) from ``entry``."""
@@ -71,21 +108,30 @@ class MagicWorkstationDecoder(TextDecoder):
 
     comment = cppStyleComment
     section = Group(Keyword('SB:'))
-    count = Word(nums)
-    setid = nestedExpr('[', ']')
-    card = empty + restOfLine
+    count = Word(nums).setParseAction(limited)
+    setid = Regex(_SETID).setParseAction(lambda tokens: tokens['setid'])
+    card = ~Literal('[') + empty + restOfLine
     entry = Group(Optional(section, None) +
                   count +
-                  Optional(setid, []) +
+                  Optional(setid, '') +
                   card)
-    deck = OneOrMore(comment | entry).ignore(comment)
+    line = comment | entry
+    deck = OneOrMore(line).ignore(comment)
+    pattern = re.compile(r'''[ \t]*(?:
+        (?:(?P<section>SB:)(?![\w$])[ \t]*)?
+        (?P<count>\d+)[ \t]*
+        (?:''' + _SETID + r'''[ \t]*)?
+        (?![ \t[])(?P<name>[^\n]*)(?:\n|\Z) |
+        //[^\n]*(?:\n|\Z) |
+        /\*(?:[^*]|\*(?!/))*\*/ |
+        \n|\Z)''', re.X)
 
     def decode_entry(self, entry):
         """Return (card name (str), attributes (dict)) from ``entry``."""
         section, count, setid, card = entry
         attrs = {'count': int(count)}
         if setid:
-            attrs['setid'] = setid[0]
+            attrs['setid'] = setid
         if section:
             attrs['section'] = 'Sideboard'
         return card, attrs
@@ -105,3 +151,191 @@ class CockatriceDecoder(XMLDecoder):
     root = 'cockatrice_deck'
     section = 'zone'
     count = 'number'
+
+
+def _agreed(lists):
+    """Return the length of the common prefix of ``lists``."""
+    size = min(len(items) for items in lists)
+    for i in range(size):
+        if any(items[i] != lists[0][i] for items in lists):
+            return i
+    return size
+
+
+class AutoPushParser(PushParser):
+    """Push parser determining the decoding format from the input, handing
+    it over to the push parsers of the candidate formats.
+
+    XML formats are told apart by their root tag. Text formats are all
+    parsed side by side, as ``AutoDecoder.loads()`` would try them in turn:
+    entries are emitted as long as all the remaining candidates agree on
+    them, and held otherwise until all but one failed, or until the input
+    ends and the first of them wins. Binary formats are not supported.
+
+    """
+
+    _root = re.compile(r'<([^\s?!/>]+)[\s/>]')
+    _formats = (MagicOnlineDecoder, MagicWorkstationDecoder)
+
+    def __init__(self, decoder):
+        super(AutoPushParser, self).__init__(decoder)
+        self._head = ''
+        self._candidates = None
+        self._errors = []
+
+    def _sniff_xml(self, final):
+        """Return the XML decoder class for the root tag of the head."""
+        match = self._root.search(self._head)
+        if match is None:
+            if final:
+                raise DecodeError('Missing a root tag')
+            return None
+        for cls in (OCTGNDecoder, CockatriceDecoder):
+            if match.group(1) == cls.root:
+                return cls
+        raise DecodeError('Unknown root tag "{}"'.format(match.group(1)))
+
+    def _sniff(self, final):
+        """Return the candidate decoder classes for the head, or ``None`` if
+        it is too short to tell.
+
+        """
+        head = self._head.lstrip()
+        if head.startswith('<'):
+            cls = self._sniff_xml(final)
+            return None if cls is None else (cls,)
+        return self._formats if head or final else None
+
+    def _parser(self, cls):
+        """Return a push parser for ``cls``, with the limits in force."""
+        decoder = cls()
+        decoder.limits = self.decoder.limits
+        return decoder.parser()
+
+    def _push_one(self, candidate, text, final):
+        """Push ``text`` to the ``candidate`` parser, collecting its
+        entries; return ``False`` if it failed.
+
+        """
+        parser, entries = candidate
+        try:
+            parser.feed(text)
+            if final:
+                parser.close()
+        except (KeyError, ParseError, ParseException) as _:
+            self._errors.append((type(parser.decoder), _))
+            return False
+        entries.extend(parser.read_entries())
+        return True
+
+    def _push(self, text, final):
+        """Push ``text`` to the candidate parsers, dropping those that
+        fail; raise ``DecodeError`` once they all did.
+
+        """
+        self._candidates = [candidate for candidate in self._candidates
+                            if self._push_one(candidate, text, final)]
+        if not self._candidates:
+            raise DecodeError(self._errors)
+
+    def _settle(self, final):
+        """Emit the entries the remaining candidates agree on, or all the
+        entries of the first one if it is the last or the input ended.
+
+        """
+        held = [entries for _, entries in self._candidates]
+        agreed = len(held[0]) if final or len(held) == 1 else _agreed(held)
+        for entry in held[0][:agreed]:
+            self._emit(entry)
+        for entries in held:
+            del entries[:agreed]
+
+    def _feed(self, text, final):
+        if self._candidates is None:
+            self._head += text
+            classes = self._sniff(final)
+            if classes is None:
+                return
+            self._candidates = [(self._parser(cls), []) for cls in classes]
+            text, self._head = self._head, ''
+
+        self._push(text, final)
+        self._settle(final)
+
+
+def _varint(data, pos):
+    """Return the unsigned LEB128 integer at ``data[pos]``, and the position
+    following it.
+
+    """
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _string(data, pos, size=None):
+    """Return the UTF-8 string at ``data[pos]``, and the position following
+    it. Unless ``size`` is given, it is read from a varint prefix.
+
+    """
+    if size is None:
+        size, pos = _varint(data, pos)
+    if pos + size > len(data):
+        raise IndexError('string out of range')
+    return data[pos:pos + size].decode('utf-8'), pos + size
+
+
+class CompactDecoder(BinaryDecoder):
+    """Decoding class for the compact binary format.
+
+    See ``CompactEncoder`` for the layout. ``names`` must be the same shared
+    name dictionary the payload was encoded with, if any.
+
+    """
+
+    magic = b'MTGB\x01'
+
+    def __init__(self, names=()):
+        self.names = list(names)
+
+    def _decode(self, string):
+        """Decode ``string``, yielding (card name (str), attributes (dict))."""
+        count, pos = _varint(string, len(self.magic))
+        sections = []
+        for _ in range(count):
+            section, pos = _string(string, pos)
+            sections.append(section)
+
+        count, pos = _varint(string, pos)
+        self.limits.check('max_entries', count)
+        for _ in range(count):
+            entry, pos = self.decode_entry(string, pos, sections)
+            yield entry
+
+        if pos != len(string):
+            raise IndexError('trailing data')
+
+    def decode_entry(self, string, pos, sections):
+        """Return ((card name (str), attributes (dict)), next position) from
+        the entry at ``string[pos]``.
+
+        """
+        tag = string[pos]
+        count, pos = _varint(string, pos + 1)
+        self.limits.check('max_count', count)
+        attrs = {'count': count}
+        if tag & 0x7f:
+            attrs['section'] = sections[(tag & 0x7f) - 1]
+        if tag & 0x80:
+            attrs['setid'], pos = _string(string, pos)
+
+        ref, pos = _varint(string, pos)
+        if ref & 1:
+            return (self.names[ref >> 1], attrs), pos
+        name, pos = _string(string, pos, ref >> 1)
+        return (name, attrs), pos
@@ -1,5 +1,8 @@
 """Encoder implementations for mtgdeck."""
-from .base.encoder import (TextEncoder, XMLEncoder)
+from collections import OrderedDict
+
+from .base.encoder import (BinaryEncoder, TextEncoder, XMLEncoder)
+from .normalize import (canonical_section, main_first)
 
 
 class EncodeError(Exception):
@@ -13,12 +16,19 @@ class MagicOnlineEncoder(TextEncoder):
 
     This is the format that MTGO outputs. Each line has the form 'quantity
     name'. An optional line containing the word 'Sideboard' indicates that
-    subsequent entries are sideboard material.
+    subsequent entries are sideboard material, so main deck entries are
+    always written first.
 
     """
+    extension = '.txt'
+
+    def _encode(self, obj):
+        setattr(self, 'sideboard', False)
+        return super(MagicOnlineEncoder, self)._encode(main_first(obj))
+
     def encode_entry(self, name, attrs):
         out = ''
-        if attrs.get('section', False) == 'Sideboard':
+        if canonical_section(attrs) == 'sideboard':
             if not getattr(self, 'sideboard', False):
                 setattr(self, 'sideboard', True)
                 out = 'Sideboard\n'
@@ -32,6 +42,8 @@ class MagicWorkstationEncoder(TextEncoder):
     fields.
 
     """
+    extension = '.mwDeck'
+
     def encode_entry(self, name, attrs):
         entries = []
 
@@ -50,6 +62,7 @@ class MagicWorkstationEncoder(TextEncoder):
 
 class OCTGNEncoder(XMLEncoder):
     """Encoding class for the OCTGN Deck Creator format."""
+    extension = '.o8d'
     root = 'deck'
     section = 'section'
     section_name = 'Main'
@@ -61,6 +74,7 @@ class OCTGNEncoder(XMLEncoder):
 
 class CockatriceEncoder(XMLEncoder):
     """Encoding class for the Cockatrice format."""
+    extension = '.cod'
     root = 'cockatrice_deck'
     section = 'zone'
     section_name = 'main'
@@ -68,3 +82,81 @@ class CockatriceEncoder(XMLEncoder):
 
     def set_content(self, card, name):
         card.attrib['name'] = name
+
+
+def _varint(out, value):
+    """Append ``value`` to ``out`` as an unsigned LEB128 integer."""
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _string(out, string):
+    """Append ``string`` to ``out`` as varint-prefixed UTF-8."""
+    data = string.encode('utf-8')
+    _varint(out, len(data))
+    out += data
+
+
+class CompactEncoder(BinaryEncoder):
+    """Encoding class for the compact binary format.
+
+    The payload is the ``magic`` bytes, a varint-counted table of section
+    names, and a varint-counted list of entries. Each entry has the form
+    'tag count [setid] name': 'tag' is a byte holding the 1-based section
+    index (or 0) in its low bits and a setid flag in its high bit, 'count' is
+    a varint, and strings are varint-prefixed UTF-8.
+
+    Names found in the optional shared ``names`` dictionary are written as
+    the varint '2 * index + 1' instead of an inline '2 * length' string.
+
+    """
+
+    extension = '.mtgb'
+    magic = b'MTGB\x01'
+
+    def __init__(self, names=()):
+        self.names = {name: i for i, name in enumerate(names)}
+
+    def _encode(self, obj):
+        sections = OrderedDict()
+        body = bytearray()
+        count = 0
+        for name, attrs in obj:
+            self.encode_entry(body, name, attrs, sections)
+            count += 1
+
+        out = bytearray(self.magic)
+        _varint(out, len(sections))
+        for section in sections:
+            _string(out, section)
+        _varint(out, count)
+        return bytes(out + body)
+
+    @staticmethod
+    def _tag(attrs, sections):
+        """Return the tag byte for ``attrs``."""
+        tag = 0
+        if 'section' in attrs:
+            tag = sections.setdefault(attrs['section'], len(sections) + 1)
+            if tag > 0x7f:
+                raise EncodeError('Too many sections')
+        return tag | 0x80 if 'setid' in attrs else tag
+
+    def encode_entry(self, out, name, attrs, sections):
+        """Append to ``out`` the encoded ``name`` and ``attrs``, registering
+        new section names in ``sections``.
+
+        """
+        out.append(self._tag(attrs, sections))
+        _varint(out, attrs['count'])
+        if 'setid' in attrs:
+            _string(out, attrs['setid'])
+
+        if name in self.names:
+            _varint(out, self.names[name] << 1 | 1)
+        else:
+            data = name.encode('utf-8')
+            _varint(out, len(data) << 1)
+            out += data
@@ -0,0 +1,111 @@
+"""Order-independent deck fingerprints for mtgdeck.
+
+A fingerprint identifies a decoded deck regardless of the order of its
+entries, of the format it was decoded from and of duplicate lines. Each
+entry is hashed on its card name and section, both case-folded, with the
+main deck and sideboard section names of every format mapped to the same
+value; set ids are ignored, as not every format carries them. The hashes,
+weighted by count, are added up modulo 2**128 in a single pass: splitting
+an entry across several lines, or reordering them, leaves the sum as is.
+
+"""
+from hashlib import blake2b
+
+from .normalize import canonical_section
+
+SIZE = 16
+_MASK = (1 << 8 * SIZE) - 1
+
+
+def _hash(name, section):
+    digest = blake2b('{}\t{}'.format(section, name.casefold()).encode('utf-8'),
+                     digest_size=SIZE).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def fingerprint(obj):
+    """Return the fingerprint of ``obj`` (a sequence of ``(card name (str),
+    attributes (dict))``) as ``SIZE`` bytes.
+
+    """
+    total = 0
+    for name, attrs in obj:
+        total += attrs['count'] * _hash(name, canonical_section(attrs))
+    return (total & _MASK).to_bytes(SIZE, 'little')
+
+
+class FingerprintSet(object):
+    """Compact set of fingerprints.
+
+    Fingerprints are stored in an open addressing hash table packed into a
+    single ``bytearray``, at ``SIZE`` bytes per slot instead of a ``bytes``
+    object each. As fingerprints are hashes already, their leading bytes are
+    used as slot index.
+
+    """
+
+    def __init__(self, capacity=1024):
+        self._slots = 1 << max(capacity - 1, 1).bit_length()
+        self._table = bytearray(self._slots * SIZE)
+        self._size = 0
+        self._empty = False
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        if not any(key):
+            return self._empty
+        return self._probe(key)[1]
+
+    def _probe(self, key):
+        """Return the slot offset where ``key`` is or would be stored, and
+        whether it was found.
+
+        """
+        mask = self._slots - 1
+        slot = int.from_bytes(key[:8], 'little') & mask
+        while True:
+            offset = slot * SIZE
+            found = self._table[offset:offset + SIZE]
+            if found == key or not any(found):
+                return offset, found == key
+            slot = (slot + 1) & mask
+
+    def add(self, key):
+        """Add fingerprint ``key``; return whether it was new."""
+        if not any(key):
+            new, self._empty = not self._empty, True
+        else:
+            offset, found = self._probe(key)
+            new = not found
+            if new:
+                self._table[offset:offset + SIZE] = key
+        self._size += new
+        if 2 * self._size > self._slots:
+            self._grow()
+        return new
+
+    def _grow(self):
+        """Double the table size, rehashing the stored fingerprints."""
+        table = self._table
+        self._slots *= 2
+        self._table = bytearray(self._slots * SIZE)
+        for offset in range(0, len(table), SIZE):
+            key = bytes(table[offset:offset + SIZE])
+            if any(key):
+                start = self._probe(key)[0]
+                self._table[start:start + SIZE] = key
+
+
+def dedup(decks, seen=None, key=fingerprint):
+    """Yield the decks in ``decks`` whose ``key`` (by default, their
+    fingerprint) was not seen before, streaming.
+
+    Pass a ``FingerprintSet`` as ``seen`` to share it across calls.
+
+    """
+    seen = FingerprintSet() if seen is None else seen
+    for deck in decks:
+        if seen.add(key(deck)):
+            yield deck
@@ -0,0 +1,269 @@
+"""Inverted card to deck index for mtgdeck.
+
+An ``IndexBuilder`` numbers decoded decks in the order they are added and
+keeps, for each card name and section, a posting list of sorted deck ids
+with the count of that card in each deck. ``dump()`` writes it to a file
+queried through ``DeckIndex``, which memory-maps it and only reads the
+posting lists a query needs.
+
+Queries are built from ``Card`` terms with ``&`` (and), ``|`` (or) and
+``~`` (not), and evaluated on bitmaps (``int``) over deck ids::
+
+    Card('Thoughtseize', count=4) & Card('Tarmogoyf', section='Sideboard')
+
+File layout::
+
+    MAGIC | decks (uint64) | terms (uint64) | terms * offset (uint64) |
+    records
+
+where each record is ``size (uint32) | postings (uint32) | key`` padded to
+a multiple of 4 bytes, then ``postings`` deck ids and ``postings`` counts
+(uint32). ``key`` is the case-folded, UTF-8 encoded card name and section
+(see ``canonical_section()``), tab separated. Records are sorted by
+``key``. All integers are little-endian.
+
+"""
+import mmap
+import struct
+import sys
+from abc import ABCMeta, abstractmethod
+from array import array
+from collections import defaultdict
+
+from .normalize import canonical_section
+
+MAGIC = b'MTGIX\x01'
+_WORD = struct.Struct('<Q')
+_RECORD = struct.Struct('<II')
+_HEADER = len(MAGIC) + 2 * _WORD.size
+
+
+def _key(name, section=''):
+    return '{}\t{}'.format(name.casefold(), section).encode('utf-8')
+
+
+def _uint32(data):
+    """Return ``data`` (little-endian bytes) as an ``array`` of uint32."""
+    values = array('I')
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def _bytes(values):
+    """Return ``values`` (an ``array`` of uint32) as little-endian bytes."""
+    if sys.byteorder != 'little':
+        values = array('I', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class IndexBuilder(object):
+    """In-memory inverted index of decoded decks."""
+
+    def __init__(self):
+        self.decks = 0
+        self.postings = defaultdict(lambda: (array('I'), array('I')))
+
+    def add(self, obj):
+        """Index ``obj`` (a sequence of ``(card name (str), attributes
+        (dict))``) and return its deck id.
+
+        """
+        counts = defaultdict(int)
+        for name, attrs in obj:
+            counts[_key(name, canonical_section(attrs))] += attrs['count']
+        for key, count in counts.items():
+            decks, values = self.postings[key]
+            decks.append(self.decks)
+            values.append(count)
+        self.decks += 1
+        return self.decks - 1
+
+    def dump(self, fout):
+        """Serialize the index to ``fout`` (a binary ``.write()``-supporting
+        file-like object).
+
+        """
+        records = []
+        for key in sorted(self.postings):
+            decks, counts = self.postings[key]
+            pad = b'\0' * (-len(key) % 4)
+            records.append(_RECORD.pack(len(key), len(decks)) + key + pad +
+                           _bytes(decks) + _bytes(counts))
+
+        fout.write(MAGIC + _WORD.pack(self.decks) + _WORD.pack(len(records)))
+        offset = 0
+        for record in records:
+            fout.write(_WORD.pack(offset))
+            offset += len(record)
+        for record in records:
+            fout.write(record)
+
+
+class DeckIndex(object):
+    """Memory-mapped, read-only view of a deck index at ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('Not a deck index: {}'.format(path))
+        self.decks, self._terms = struct.unpack_from('<QQ', self._map,
+                                                     len(MAGIC))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return self.decks
+
+    def _record(self, i):
+        """Return the absolute offset of the ``i``-th record, and its key."""
+        base = _HEADER + self._terms * _WORD.size
+        start = base + _WORD.unpack_from(self._map,
+                                         _HEADER + i * _WORD.size)[0]
+        size = _RECORD.unpack_from(self._map, start)[0]
+        key = self._map[start + _RECORD.size:start + _RECORD.size + size]
+        return start, key
+
+    def _lower(self, key):
+        """Return the index of the first record whose key is not below
+        ``key``.
+
+        """
+        low, high = 0, self._terms
+        while low < high:
+            mid = (low + high) // 2
+            if self._record(mid)[1] < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def keys(self, name, section=None):
+        """Yield the record offsets for card ``name`` in ``section``, or in
+        any section if it is ``None``.
+
+        """
+        if section is not None:
+            key = _key(name, canonical_section({'section': section}))
+        else:
+            key = _key(name)
+        for i in range(self._lower(key), self._terms):
+            start, found = self._record(i)
+            if found != key and (section is not None or
+                                 not found.startswith(key)):
+                return
+            yield start
+
+    def postings(self, start):
+        """Return the deck ids and counts (``array`` of uint32) of the
+        record at offset ``start``.
+
+        """
+        size, length = _RECORD.unpack_from(self._map, start)
+        start += _RECORD.size + size + -size % 4
+        middle = start + 4 * length
+        return (_uint32(self._map[start:middle]),
+                _uint32(self._map[middle:middle + 4 * length]))
+
+    def bitmap(self, decks):
+        """Return ``decks`` (deck ids) as a bitmap."""
+        bits = bytearray((self.decks + 7) // 8)
+        for deck in decks:
+            bits[deck >> 3] |= 1 << (deck & 7)
+        return int.from_bytes(bits, 'little')
+
+    def search(self, query):
+        """Return the sorted list of deck ids matching ``query``."""
+        bits = query.evaluate(self)
+        data = bits.to_bytes((self.decks + 7) // 8, 'little')
+        return [8 * i + j for i, byte in enumerate(data) if byte
+                for j in range(8) if byte >> j & 1]
+
+    def close(self):
+        """Unmap and close the index file."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = self._map = None
+
+
+class Query(metaclass=ABCMeta):
+    """Base class for index queries."""
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    @abstractmethod
+    def evaluate(self, index):
+        """Return the bitmap of the decks in ``index`` matching the query.
+        """
+
+
+class Card(Query):
+    """Match decks running at least ``count`` copies of card ``name`` in
+    ``section`` (by default, the main deck), or in any single section if it
+    is ``None``.
+
+    """
+
+    def __init__(self, name, count=1, section=''):
+        self.name = name
+        self.count = count
+        self.section = section
+
+    def evaluate(self, index):
+        bits = 0
+        for start in index.keys(self.name, self.section):
+            decks, counts = index.postings(start)
+            if self.count > 1:
+                decks = (deck for deck, count in zip(decks, counts)
+                         if count >= self.count)
+            bits |= index.bitmap(decks)
+        return bits
+
+
+class _Binary(Query):  # pylint: disable=W0223
+    """Base class for queries combining ``left`` and ``right``."""
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+
+class And(_Binary):
+    """Match decks matching both ``left`` and ``right``."""
+
+    def evaluate(self, index):
+        return self.left.evaluate(index) & self.right.evaluate(index)
+
+
+class Or(_Binary):
+    """Match decks matching either ``left`` or ``right``."""
+
+    def evaluate(self, index):
+        return self.left.evaluate(index) | self.right.evaluate(index)
+
+
+class Not(Query):
+    """Match decks not matching ``query``."""
+
+    def __init__(self, query):
+        self.query = query
+
+    def evaluate(self, index):
+        return ((1 << index.decks) - 1) ^ self.query.evaluate(index)
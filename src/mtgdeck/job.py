@@ -0,0 +1,144 @@
+"""Resumable bulk conversion jobs for mtgdeck.
+
+A ``Job`` converts a list of decklist files into a target directory, and
+keeps a journal there of the inputs done, with the size of their output,
+and of the inputs that failed, with the reason. The journal is flushed
+every so many inputs and when the job ends, by writing a new file and
+renaming it over the old one, so it is never seen half written. Outputs
+are written the same way.
+
+Running a job again with the same journal resumes it: inputs already
+done are skipped, unless their output is missing or does not have the
+journaled size, and so are inputs that failed.
+
+"""
+import json
+import os
+
+from .compression import decompress
+from .decoder import AutoDecoder
+from .encoder import MagicOnlineEncoder
+
+JOURNAL = '.mtgdeck-journal.json'
+
+
+def _replace(path, write):
+    """Write ``path`` atomically with ``write(fout)``."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fout:
+        write(fout)
+        fout.flush()
+        os.fsync(fout.fileno())
+    os.replace(tmp, path)
+
+
+def _under(path, root):
+    """Return whether ``path`` is ``root`` or under it (absolute paths)."""
+    return os.path.commonpath([root, path]) == root
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+class Job(object):
+    """Convert the decklist files at ``inputs``, under the ``root``
+    directory, to ``target`` with a single ``decoder`` and ``encoder``
+    instance, flushing the journal every ``every`` inputs.
+
+    Inputs are journaled, and outputs mirror them, relative to ``root``,
+    with the file extension of the encoder: the same ``root`` must be used
+    to resume a job. Inputs under ``target`` (ie: its outputs, journal and
+    temporary files, when it is under ``root``) are left out. Raise
+    ``ValueError`` if an input is not under ``root`` or ``every`` is less
+    than 1.
+
+    """
+
+    def __init__(self, inputs, target, root, decoder=AutoDecoder,
+                 encoder=MagicOnlineEncoder, every=100):
+        if every < 1:
+            raise ValueError('Invalid journal interval: {}'.format(every))
+        self.root = os.path.abspath(root)
+        self.target = target
+        self.inputs = sorted(path for path in map(os.path.abspath, inputs)
+                             if not _under(path, os.path.abspath(target)))
+        for path in self.inputs:
+            if not _under(path, self.root):
+                raise ValueError('Input {} is not under {}'.format(
+                    path, self.root))
+        self.decoder = decoder()
+        self.encoder = encoder()
+        self.every = every
+        self.path = os.path.join(target, JOURNAL)
+        self.journal = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as fin:
+                journal = json.load(fin)
+        except (OSError, ValueError):
+            journal = {}
+        journal.setdefault('done', {})
+        journal.setdefault('failed', {})
+        return journal
+
+    def flush(self):
+        """Write the journal atomically."""
+        _replace(self.path, lambda fout: json.dump(self.journal, fout,
+                                                   separators=(',', ':')))
+
+    def output(self, name):
+        """Return the output path for the input ``name``."""
+        return os.path.join(self.target,
+                            os.path.splitext(name)[0] + self.encoder.extension)
+
+    def pending(self):
+        """Yield the names (relative to the inputs root) of the inputs left
+        to convert.
+
+        """
+        for path in self.inputs:
+            name = os.path.relpath(path, self.root)
+            if name in self.journal['failed']:
+                continue
+            size = self.journal['done'].get(name)
+            if size is None or size != _size(self.output(name)):
+                yield name
+
+    def convert(self, name):
+        """Convert the input ``name``; return the output size."""
+        with open(os.path.join(self.root, name), encoding='utf-8') as fin:
+            deck = self.decoder.load(decompress(fin))
+
+        path = self.output(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _replace(path, lambda fout: self.encoder.dump(deck, fout))
+        return _size(path)
+
+    def _step(self, name):
+        """Convert ``name``, journaling the outcome."""
+        self.journal['done'].pop(name, None)
+        try:
+            self.journal['done'][name] = self.convert(name)
+        except Exception as _:  # pylint: disable=W0703
+            self.journal['failed'][name] = str(_)
+
+    def run(self):
+        """Convert the pending inputs; return the number of inputs
+        converted (or failed) by this run.
+
+        """
+        os.makedirs(self.target, exist_ok=True)
+        count = 0
+        try:
+            for count, name in enumerate(self.pending(), 1):
+                self._step(name)
+                if count % self.every == 0:
+                    self.flush()
+        finally:
+            self.flush()
+        return count
@@ -0,0 +1,75 @@
+"""Lazy, buffer-backed deck views for mtgdeck."""
+from array import array
+from collections.abc import Sequence
+
+
+class LazyDeck(Sequence):
+    """Read-only sequence of ``(card name (str), attributes (dict))`` backed
+    by a decoded ``buffer``.
+
+    Only the offsets of names and set ids, counts and sideboard flags are
+    stored, in compact arrays. Names and attributes are built on access, so
+    aggregates such as ``total()`` allocate next to nothing.
+
+    """
+
+    section = 'Sideboard'
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.counts = array('q')
+        self._names = array('q')
+        self._setids = array('q')
+        self._sideboard = array('B')
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        attrs = {'count': self.counts[i]}
+        start, end = self._setids[2 * i:2 * i + 2]
+        if end > start:
+            attrs['setid'] = self.buffer[start:end]
+        if self._sideboard[i]:
+            attrs['section'] = self.section
+        return self.name(i), attrs
+
+    def __repr__(self):
+        return '<{} of {} entries>'.format(type(self).__name__, len(self))
+
+    def append(self, match, sideboard):
+        """Record the entry matched by ``match`` (a regular expression match
+        over ``buffer``, with ``count``, ``name`` and, optionally, ``setid``
+        groups).
+
+        """
+        self.counts.append(int(match.group('count')))
+        self._names.extend(match.span('name'))
+        if 'setid' in match.re.groupindex:
+            self._setids.extend(match.span('setid'))
+        else:
+            self._setids.extend((-1, -1))
+        self._sideboard.append(sideboard)
+
+    def name(self, i):
+        """Return the card name of the ``i``-th entry."""
+        start, end = self._names[2 * i:2 * i + 2]
+        return self.buffer[start:end]
+
+    def is_sideboard(self, i):
+        """Return whether the ``i``-th entry is sideboard material."""
+        return bool(self._sideboard[i])
+
+    def total(self, sideboard=None):
+        """Return the number of cards, counting only main deck or sideboard
+        entries if ``sideboard`` is set to ``False`` or ``True``.
+
+        """
+        if sideboard is None:
+            return sum(self.counts)
+        return sum(count for count, flag in zip(self.counts, self._sideboard)
+                   if flag == sideboard)
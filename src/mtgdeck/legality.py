@@ -0,0 +1,149 @@
+"""Deck construction rules and legality checks for mtgdeck.
+
+``Rules`` compiles a format's construction rules and a ban list into a
+card name index and parallel arrays of copy limits and rule codes, so
+checking a deck costs one dictionary lookup per distinct card and no
+per-rule branching. Ban lists are plain text files::
+
+    # comments are ignored
+    [banned]
+    Black Lotus
+    [restricted]
+    Ancestral Recall
+    [unlimited]
+    Relentless Rats
+
+"""
+from array import array
+from collections import defaultdict, namedtuple
+
+from .normalize import canonical_section
+
+BASIC_LANDS = ('Plains', 'Island', 'Swamp', 'Mountain', 'Forest', 'Wastes',
+               'Snow-Covered Plains', 'Snow-Covered Island',
+               'Snow-Covered Swamp', 'Snow-Covered Mountain',
+               'Snow-Covered Forest', 'Snow-Covered Wastes')
+FORMATS = {'constructed': {'min_main': 60, 'max_sideboard': 15,
+                           'copies': 4},
+           'limited': {'min_main': 40, 'max_sideboard': None,
+                       'copies': None}}
+RULES = ('copies', 'restricted', 'banned', 'unlimited')
+UNLIMITED = -1
+
+Violation = namedtuple('Violation', 'rule card count limit')
+Violation.__doc__ = """Broken ``rule``, with the offending ``card`` (or
+``None`` for deck size rules), its ``count`` and the ``limit``."""
+
+
+def _parse(lists, current, line, number):
+    """Parse ban list ``line`` into ``lists``; return the current list."""
+    if line.startswith('[') and line.endswith(']'):
+        name = line[1:-1].strip().lower()
+        if name not in lists:
+            raise ValueError('Unknown list {} at line {}'.format(line, number))
+        return lists[name]
+    if line:
+        if current is None:
+            raise ValueError('Card outside of a list at line {}'
+                             .format(number))
+        current.append(line)
+    return current
+
+
+class Rules(object):
+    """Construction rules: a main deck of ``min_main`` to ``max_main``
+    cards, a sideboard of at most ``max_sideboard`` cards, and at most
+    ``copies`` copies of any card across both (``None`` for no limit).
+
+    Cards in ``banned`` are not allowed, cards in ``restricted`` are allowed
+    a single copy, and cards in ``unlimited`` any number of copies. Card
+    names are matched case-insensitively.
+
+    """
+
+    def __init__(self, min_main=60, max_main=None, max_sideboard=15,
+                 copies=4, banned=(), restricted=(), unlimited=BASIC_LANDS):
+        self.min_main = min_main
+        self.max_main = max_main
+        self.max_sideboard = max_sideboard
+        self.index = {}
+        self.limits = array('l', [UNLIMITED if copies is None else copies])
+        self.rules = array('B', [0])
+        for names, rule, limit in ((unlimited, 3, UNLIMITED),
+                                   (restricted, 1, 1), (banned, 2, 0)):
+            for name in names:
+                self._compile(name.casefold(), rule, limit)
+
+    def _compile(self, key, rule, limit):
+        """Set the ``rule`` (index in ``RULES``) and ``limit`` for ``key``.
+        """
+        if key not in self.index:
+            self.index[key] = len(self.limits)
+            self.limits.append(limit)
+            self.rules.append(rule)
+        else:
+            self.limits[self.index[key]] = limit
+            self.rules[self.index[key]] = rule
+
+    @classmethod
+    def load(cls, fin, **kwargs):
+        """Return ``Rules`` with the ban list read from ``fin`` (a
+        ``.read()``-supporting file-like object), ``kwargs`` setting the
+        other rules (ie: ``**FORMATS['constructed']``).
+
+        Raise ``ValueError`` on unknown lists or cards outside of a list.
+
+        """
+        lists = {'banned': [], 'restricted': [],
+                 'unlimited': list(kwargs.pop('unlimited', BASIC_LANDS))}
+        current = None
+        for number, line in enumerate(fin, 1):
+            current = _parse(lists, current, line.split('#', 1)[0].strip(),
+                             number)
+        return cls(**dict(kwargs, **lists))
+
+    def _sizes(self, main, sideboard):
+        """Yield deck size violations."""
+        if main < self.min_main:
+            yield Violation('min_main', None, main, self.min_main)
+        if self.max_main is not None and main > self.max_main:
+            yield Violation('max_main', None, main, self.max_main)
+        if self.max_sideboard is not None and sideboard > self.max_sideboard:
+            yield Violation('max_sideboard', None, sideboard,
+                            self.max_sideboard)
+
+    def check(self, obj):
+        """Return the list of ``Violation`` of ``obj`` (a sequence of
+        ``(card name (str), attributes (dict))``), empty if it is legal.
+
+        Entries outside of the main deck and sideboard are ignored.
+
+        """
+        totals = {'': 0, 'sideboard': 0}
+        copies = defaultdict(int)
+        names = {}
+        for name, attrs in obj:
+            section = canonical_section(attrs)
+            if section in totals:
+                key = name.casefold()
+                totals[section] += attrs['count']
+                copies[self.index.get(key, 0), key] += attrs['count']
+                names.setdefault(key, name)
+
+        violations = list(self._sizes(totals[''], totals['sideboard']))
+        for (i, key), count in copies.items():
+            limit = self.limits[i]
+            if UNLIMITED < limit < count:
+                violations.append(Violation(RULES[self.rules[i]], names[key],
+                                            count, limit))
+        return violations
+
+    def check_many(self, decks):
+        """Yield the list of ``Violation`` of each of ``decks``.
+
+        ``Rules`` are picklable, so ``bulk.imap(rules.check, decks)`` spreads
+        the checks over a process pool.
+
+        """
+        for deck in decks:
+            yield self.check(deck)
@@ -0,0 +1,110 @@
+"""Decoding of decklists straight from zip and tar archives for mtgdeck.
+
+Archive members are read as streams, never extracted to disk, and handed
+in chunks to a worker pool (see ``bulk.imap()``), only a bounded window of
+them being read ahead of the results consumed. Each member is decoded
+with the decoder implied by its file name extension, or, failing that, by
+sniffing with ``AutoDecoder``.
+
+Member names are not trusted: ``safe_name()`` must be used before
+deriving any file path from them.
+
+"""
+import fnmatch
+import os
+import posixpath
+import tarfile
+import zipfile
+from collections import deque
+from functools import partial
+
+from .bulk import imap
+from .decoder import (AutoDecoder, CockatriceDecoder, CompactDecoder,
+                      MagicOnlineDecoder, MagicWorkstationDecoder,
+                      OCTGNDecoder)
+
+DECODERS = {'.txt': MagicOnlineDecoder,
+            '.mwdeck': MagicWorkstationDecoder,
+            '.o8d': OCTGNDecoder,
+            '.cod': CockatriceDecoder,
+            '.mtgb': CompactDecoder}
+
+
+def decoder_for(name):
+    """Return the decoder class for a file ``name``, by extension."""
+    return DECODERS.get(os.path.splitext(name)[1].lower(), AutoDecoder)
+
+
+def safe_name(name):
+    """Return the archive member ``name`` normalized to a relative path.
+
+    Raise ``ValueError`` if it is absolute or has ``..`` components, so
+    that it can not escape the directory it is joined to.
+
+    """
+    path = posixpath.normpath(name.replace('\\', '/'))
+    parts = path.split('/')
+    if path.startswith('/') or parts[0].endswith(':') or '..' in parts \
+            or path == '.':
+        raise ValueError('Unsafe archive member name: {!r}'.format(name))
+    return path.replace('/', os.sep)
+
+
+def _zip(path, pattern):
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and fnmatch.fnmatch(info.filename, pattern):
+                with archive.open(info) as fin:
+                    yield info.filename, fin.read()
+
+
+def _tar(path, pattern):
+    with tarfile.open(path, 'r|*') as archive:
+        for info in archive:
+            if info.isfile() and fnmatch.fnmatch(info.name, pattern):
+                yield info.name, archive.extractfile(info).read()
+
+
+def members(path, pattern='*'):
+    """Yield ``(name, content (bytes))`` for each file in the zip or tar
+    (possibly compressed) archive at ``path`` whose name matches
+    ``pattern``, in archive order.
+
+    """
+    if zipfile.is_zipfile(path):
+        return _zip(path, pattern)
+    if tarfile.is_tarfile(path):
+        return _tar(path, pattern)
+    raise ValueError('Not a zip or tar archive: {}'.format(path))
+
+
+def _decode(cls, member):
+    """Decode ``member`` (``(name, content)``) with ``cls``, or the decoder
+    for its name if ``None``.
+
+    """
+    name, data = member
+    decoder = (cls or decoder_for(name))()
+    if not data.startswith(CompactDecoder.magic):
+        data = data.decode('utf-8')
+    return decoder.loads(data)
+
+
+def load_members(path, cls=None, pattern='*', **kwargs):
+    """Yield ``(name, obj)`` for each decklist in the archive at ``path``
+    (see ``members()``), in archive order.
+
+    To use a single decoder for all members, specify it with ``cls``. A
+    member that fails to decode yields its exception instead. ``kwargs``
+    are passed on to ``bulk.imap()``: members are read as results are
+    consumed, at most ``window`` chunks ahead.
+
+    """
+    names = deque()
+
+    def items():
+        for member in members(path, pattern):
+            names.append(member[0])
+            yield member
+    for result in imap(partial(_decode, cls), items(), **kwargs):
+        yield names.popleft(), result
@@ -0,0 +1,113 @@
+"""Parallel decoding of files holding many text decklists.
+
+Deck boundaries are found with a single regular expression scan over the
+raw buffer (a memory-mapped file, or a string), without parsing any deck.
+The decks are then decoded by a pool of worker processes and returned in
+their original order, each tagged with its offset in the source.
+
+"""
+import mmap
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .decoder import MagicOnlineDecoder
+
+#: Decks are separated by blank lines, with either LF or CRLF line ends.
+SEPARATOR = r'\r?\n(?:[ \t\r]*\n)+'
+
+#: Decks are separated by blank lines, or start at any comment line. Only
+#: for files without comments within decks (ie: ``// Creatures``).
+HEADERS = SEPARATOR + r'|\r?\n(?=[ \t]*//)'
+
+_COMMENTS = r'\s*(?://[^\n]*\s*)*'
+
+
+def _compile(pattern, buf):
+    """Compile ``pattern`` to match the type (str or bytes) of ``buf``."""
+    if not isinstance(buf, str):
+        pattern = pattern.encode('ascii')
+    return re.compile(pattern)
+
+
+def split(buf, separator=SEPARATOR):
+    """Yield ``(start, end)`` offsets of each deck in ``buf`` (a ``str``,
+    ``bytes`` or ``mmap`` instance).
+
+    ``separator`` is a regular expression matching the text between decks
+    (ie: ``SEPARATOR``, or ``HEADERS`` to also split at comment lines).
+    Segments holding nothing but comments (ie: the header of the next deck)
+    or whitespace are merged into the deck that follows them.
+
+    """
+    boundary = _compile(separator, buf)
+    comments = _compile(_COMMENTS, buf)
+    start = 0
+
+    for match in boundary.finditer(buf):
+        if not comments.fullmatch(buf, start, match.start()):
+            yield start, match.start()
+            start = match.end()
+
+    if not comments.fullmatch(buf, start, len(buf)):
+        yield start, len(buf)
+
+
+def _loads(cls, string):
+    return cls().loads(string)
+
+
+def _load_range(path, cls, encoding, span):
+    start, end = span
+    with open(path, 'rb') as fin:
+        fin.seek(start)
+        return cls().loads(fin.read(end - start).decode(encoding))
+
+
+def _map(func, items, workers, chunksize):
+    """Return ``[func(item) for item in items]``, computed by ``workers``
+    processes.
+
+    """
+    if workers == 1:
+        return list(map(func, items))
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def loads_decks(string, cls=MagicOnlineDecoder, separator=SEPARATOR,
+                workers=None, chunksize=64):
+    """Deserialize ``string`` (a ``str`` containing many MTG decklists) to a
+    list of ``(offset (int), deck)`` pairs, in input order.
+
+    Decks are decoded with ``cls`` in a pool of ``workers`` processes (one
+    per CPU by default; ``1`` decodes in-process), ``chunksize`` decks per
+    task.
+
+    """
+    spans = list(split(string, separator))
+    decks = _map(partial(_loads, cls),
+                 [string[start:end] for start, end in spans],
+                 workers, chunksize)
+    return list(zip((start for start, _ in spans), decks))
+
+
+def load_decks(path, cls=MagicOnlineDecoder, separator=SEPARATOR,
+               workers=None, chunksize=64, encoding='utf-8'):
+    """Deserialize the file at ``path`` (containing many MTG decklists) to a
+    list of ``(byte offset (int), deck)`` pairs, in file order.
+
+    The file is memory-mapped to find deck boundaries; each worker then
+    reads and decodes only its own byte ranges, so deck text is never sent
+    between processes. See ``loads_decks()`` for the remaining arguments.
+
+    """
+    with open(path, 'rb') as fin:
+        if not fin.seek(0, 2):
+            return []
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            spans = list(split(buf, separator))
+
+    decks = _map(partial(_load_range, path, cls, encoding), spans,
+                 workers, chunksize)
+    return list(zip((start for start, _ in spans), decks))
@@ -0,0 +1,151 @@
+"""Card name resolution for mtgdeck.
+
+Hand-typed decklists frequently contain misspelled card names. A
+``NameIndex`` is a BK-tree built once over a list of canonical card names:
+lookups only visit the subtrees that can hold a match within the requested
+edit distance, instead of scanning the whole card list.
+
+"""
+import json
+from collections import OrderedDict
+
+
+def distance(source, target):
+    """Return the Levenshtein edit distance between ``source`` and
+    ``target``.
+
+    """
+    if len(source) < len(target):
+        source, target = target, source
+
+    previous = list(range(len(target) + 1))
+    for i, schar in enumerate(source, 1):
+        current = [i]
+        for j, tchar in enumerate(target, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (schar != tchar)))
+        previous = current
+    return previous[-1]
+
+
+class NameIndex(object):
+    """BK-tree index over canonical card names.
+
+    Names are matched case-insensitively. ``tolerance`` is the maximum edit
+    distance accepted by ``resolve()``, and ``cache_size`` bounds the number
+    of resolved names remembered between lookups.
+
+    """
+
+    def __init__(self, names=(), tolerance=2, cache_size=4096):
+        self.tolerance = tolerance
+        self.cache_size = cache_size
+        self._names = {}
+        self._keys = []
+        self._children = []
+        self._cache = OrderedDict()
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, name):
+        return name.casefold() in self._names
+
+    def add(self, name):
+        """Add the canonical ``name`` to the index."""
+        key = name.casefold()
+        if not key or key in self._names:
+            return
+
+        self._names[key] = name
+        self._cache.clear()
+        self._keys.append(key)
+        self._children.append({})
+
+        node = 0
+        while node != len(self._keys) - 1:
+            dist = distance(key, self._keys[node])
+            child = self._children[node].setdefault(dist, len(self._keys) - 1)
+            node = child
+
+    def search(self, name, tolerance=None):
+        """Return a sorted list of ``(distance, canonical name)`` pairs for
+        all indexed names within ``tolerance`` edits of ``name``.
+
+        """
+        tolerance = self.tolerance if tolerance is None else tolerance
+        key = name.casefold()
+        found = []
+        stack = [0] if self._keys else []
+
+        while stack:
+            node = stack.pop()
+            dist = distance(key, self._keys[node])
+            if dist <= tolerance:
+                found.append((dist, self._names[self._keys[node]]))
+            stack.extend(child for edge, child in self._children[node].items()
+                         if dist - tolerance <= edge <= dist + tolerance)
+
+        return sorted(found)
+
+    def suggest(self, name, limit=5, tolerance=None):
+        """Return up to ``limit`` canonical names closest to ``name``."""
+        return [match for _, match in self.search(name, tolerance)[:limit]]
+
+    def resolve(self, name):
+        """Return the canonical spelling of ``name``, or ``None`` if no
+        indexed name is within ``tolerance`` edits of it.
+
+        """
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            return self._cache[name]
+
+        match = self._names.get(name.casefold())
+        if match is None:
+            match = next(iter(self.suggest(name, limit=1)), None)
+
+        self._cache[name] = match
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return match
+
+    def dump(self, fout):
+        """Serialize the index to ``fout`` (a ``.write()``-supporting
+        file-like object).
+
+        """
+        json.dump({'tolerance': self.tolerance,
+                   'names': [self._names[key] for key in self._keys],
+                   'children': [sorted(children.items())
+                                for children in self._children]}, fout)
+
+    @classmethod
+    def load(cls, fin, cache_size=4096):
+        """Deserialize an index previously written by ``dump()`` from ``fin``
+        (a ``.read()``-supporting file-like object).
+
+        The tree is restored as-is, without recomputing any distances.
+
+        """
+        data = json.load(fin)
+        index = cls(tolerance=data['tolerance'], cache_size=cache_size)
+        index._keys = [name.casefold() for name in data['names']]
+        index._names = dict(zip(index._keys, data['names']))
+        index._children = [dict(children) for children in data['children']]
+        return index
+
+
+def resolve(obj, index):
+    """Yield the entries in ``obj`` with card names replaced by their
+    canonical spelling in ``index``.
+
+    ``obj`` is a sequence of ``(card name (str), attributes (dict))``. Names
+    that cannot be resolved are passed through unchanged.
+
+    """
+    for name, attrs in obj:
+        yield index.resolve(name) or name, attrs
@@ -0,0 +1,100 @@
+"""Deck normalization for mtgdeck.
+
+Decoded decks may list sections interleaved, and the same card on several
+lines. ``sections()`` partitions a deck by section in a single hashed pass,
+optionally merging duplicate ``(name, section, setid)`` entries and sorting
+canonically; ``normalize()`` flattens the result back into a deck. As merged
+counts and the order of sections are only known at the end of the deck,
+both hold the whole deck. ``main_first()`` only reorders, holding nothing
+but the entries outside of the main deck.
+
+The main deck is section ``None``, or any of its aliases in other formats
+(ie: ``main``), as mapped by ``canonical_section()``.
+
+"""
+from collections import OrderedDict
+
+SECTIONS = {'main': '', 'side': 'sideboard'}
+
+
+def canonical_section(attrs):
+    """Return the case-folded section of an entry with ``attrs``, ``''``
+    standing for the main deck and ``sideboard`` for the sideboard.
+
+    """
+    section = (attrs.get('section') or '').casefold()
+    return SECTIONS.get(section, section)
+
+
+def _sort_key(entry):
+    name, attrs = entry
+    return name.casefold(), name, attrs.get('setid') or ''
+
+
+def _section_key(section):
+    return section is not None, section or ''
+
+
+def _section(attrs):
+    """Return the section of an entry with ``attrs``, ``None`` for the main
+    deck.
+
+    """
+    return attrs.get('section') if canonical_section(attrs) else None
+
+
+def main_first(obj):
+    """Yield the entries of ``obj``, the main deck first and then the other
+    sections, in order of appearance.
+
+    Main deck entries are yielded as they come: only the other sections are
+    held until the end of ``obj``.
+
+    """
+    held = OrderedDict()
+    for name, attrs in obj:
+        section = _section(attrs)
+        if section is None:
+            yield name, attrs
+        else:
+            held.setdefault(section, []).append((name, attrs))
+    for entries in held.values():
+        yield from entries
+
+
+def sections(obj, merge=True, sort=False):
+    """Yield ``(section, entries (list))`` pairs partitioning ``obj``.
+
+    ``obj`` is a sequence of ``(card name (str), attributes (dict))``. The
+    main deck (section ``None``, for all of its aliases) comes first,
+    followed by the other sections in order of appearance. If ``merge`` is
+    set, the counts of entries with the same name, section and setid are
+    added up into the first one. If ``sort`` is set, sections and the
+    entries within them are sorted by name instead.
+
+    """
+    buckets = OrderedDict([(None, OrderedDict())])
+    for name, attrs in obj:
+        bucket = buckets.setdefault(_section(attrs), OrderedDict())
+        key = (name, attrs.get('setid')) if merge else len(bucket)
+        if key in bucket:
+            bucket[key][1]['count'] += attrs['count']
+        else:
+            bucket[key] = (name, dict(attrs))
+
+    order = sorted(buckets, key=_section_key) if sort else list(buckets)
+    for section in order:
+        entries = list(buckets.pop(section).values())
+        if entries:
+            yield section, sorted(entries, key=_sort_key) if sort else entries
+
+
+def normalize(obj, merge=True, sort=False):
+    """Yield the entries of ``obj`` grouped by section.
+
+    See ``sections()`` for the meaning of ``merge`` and ``sort``.
+
+    """
+    for _, entries in sections(obj, merge, sort):
+        for entry in entries:
+            yield entry
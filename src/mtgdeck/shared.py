@@ -0,0 +1,258 @@
+"""Shared memory transport of decoded decks for mtgdeck.
+
+Worker processes ``pack()`` decoded decks into a
+``multiprocessing.shared_memory`` block in a columnar layout, and send only
+the block name back to the parent, instead of pickled lists of ``(str,
+dict)``. The parent maps the block with ``SharedDecks``, whose columns are
+``memoryview`` instances over the shared memory: nothing is copied until
+an entry is accessed.
+
+Block layout::
+
+    MAGIC | decks | entries | strings | size (uint32) |
+    decks + 1 entry offsets | entries * name | entries * count |
+    entries * section | entries * setid | strings + 1 string offsets |
+    size bytes of UTF-8 strings
+
+where names, sections and setids are string table indexes, sections and
+setids being offset by one so that ``0`` stands for a missing attribute.
+Only the ``count``, ``section`` and ``setid`` attributes are kept. All
+integers are native uint32.
+
+A block belongs to whoever maps it with ``SharedDecks`` (by default), and
+is unlinked when it is closed.
+
+Shared memory needs Python 3.8 or later: on earlier versions, ``AVAILABLE``
+is false and using this module raises ``RuntimeError``.
+
+"""
+import struct
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import accumulate
+
+from .bulk import (chunked, ordered, window_size)
+from .decoder import AutoDecoder
+
+try:
+    from multiprocessing import resource_tracker
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:  # Python < 3.8
+    resource_tracker = SharedMemory = None
+
+AVAILABLE = SharedMemory is not None
+MAGIC = b'MTGSM\x01'
+_HEADER = struct.Struct('=6s2xIIII')
+
+
+class _Columns(object):
+    """Columns of a batch of decks, and its string table."""
+
+    def __init__(self):
+        self.offsets = array('I', [0])
+        self.columns = [array('I') for _ in range(4)]
+        self.strings = {}
+
+    def intern(self, string):
+        """Return the string table index of ``string``."""
+        return self.strings.setdefault(string, len(self.strings))
+
+    def append(self, obj):
+        """Add the entries of ``obj`` as a deck."""
+        names, counts, sections, setids = self.columns
+        for name, attrs in obj:
+            names.append(self.intern(name))
+            counts.append(attrs['count'])
+            for column, key in ((sections, 'section'), (setids, 'setid')):
+                value = attrs.get(key)
+                column.append(0 if value is None else self.intern(value) + 1)
+        self.offsets.append(len(names))
+
+
+def _check():
+    """Raise ``RuntimeError`` unless shared memory is available."""
+    if not AVAILABLE:
+        raise RuntimeError('Shared memory needs Python 3.8 or later')
+
+
+def _untrack(block):
+    """Stop the resource tracker from unlinking ``block`` at exit, leaving
+    it to whoever owns it.
+
+    """
+    resource_tracker.unregister(block._name,  # pylint: disable=W0212
+                                'shared_memory')
+
+
+def pack(decks):
+    """Write ``decks`` (decoded decks) to a new shared memory block; return
+    its name.
+
+    The block is left open for a ``SharedDecks`` to take over: the caller
+    must hand its name over or unlink it. It is not tracked by this process,
+    so that it outlives it (ie: a pool worker).
+
+    """
+    _check()
+    columns = _Columns()
+    for deck in decks:
+        columns.append(deck)
+    data = [string.encode('utf-8') for string in columns.strings]
+    offsets = array('I', [0])
+    for string in data:
+        offsets.append(offsets[-1] + len(string))
+
+    body = b''.join([columns.offsets.tobytes()] +
+                    [column.tobytes() for column in columns.columns] +
+                    [offsets.tobytes()] + data)
+    header = _HEADER.pack(MAGIC, len(columns.offsets) - 1,
+                          len(columns.columns[0]), len(data), offsets[-1])
+    block = SharedMemory(create=True, size=len(header) + len(body))
+    block.buf[:len(header)] = header
+    block.buf[len(header):len(header) + len(body)] = body
+    _untrack(block)
+    name = block.name
+    block.close()
+    return name
+
+
+class SharedDecks(Sequence):
+    """Read-only sequence of the decks in the shared memory block ``name``.
+
+    ``offsets``, ``names``, ``counts``, ``sections`` and ``setids`` are the
+    raw columns (``memoryview`` of uint32). Decks are built on access, as
+    lists of ``(card name (str), attributes (dict))``. If ``owner`` is set,
+    closing unlinks the block; otherwise it is left to its owner, even at
+    interpreter exit. ``errors`` maps deck indexes to the exception
+    raised decoding them, if any.
+
+    """
+
+    def __init__(self, name, owner=True, errors=None):
+        _check()
+        self.owner = owner
+        self.errors = errors or {}
+        self._block = SharedMemory(name)
+        self._views = []
+        magic, decks, entries, strings, _ = _HEADER.unpack_from(
+            self._block.buf)
+        if not owner or magic != MAGIC:
+            _untrack(self._block)
+        if magic != MAGIC:
+            self._block.close()
+            raise ValueError('Not a shared deck block: {}'.format(name))
+
+        sizes = [decks + 1] + [entries] * 4 + [strings + 1]
+        words = self._view(self._block.buf[_HEADER.size:
+                                           _HEADER.size + 4 * sum(sizes)])
+        words = self._view(words.cast('I'))
+        bounds = list(accumulate([0] + sizes))
+        (self.offsets, self.names, self.counts, self.sections, self.setids,
+         self._offsets) = (self._view(words[start:end])
+                           for start, end in zip(bounds, bounds[1:]))
+        start = _HEADER.size + 4 * sum(sizes)
+        self._data = self._view(self._block.buf[start:start +
+                                                self._offsets[-1]])
+        self._strings = [None] * strings
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return [self.entry(j)
+                for j in range(self.offsets[i], self.offsets[i + 1])]
+
+    def _view(self, view):
+        """Track ``view`` (a ``memoryview``) for release; return it."""
+        self._views.append(view)
+        return view
+
+    def string(self, i):
+        """Return the ``i``-th string of the string table."""
+        if self._strings[i] is None:
+            start, end = self._offsets[i], self._offsets[i + 1]
+            self._strings[i] = bytes(self._data[start:end]).decode('utf-8')
+        return self._strings[i]
+
+    def entry(self, j):
+        """Return the ``j``-th entry as ``(card name, attributes)``."""
+        attrs = {'count': self.counts[j]}
+        for column, key in ((self.sections, 'section'),
+                            (self.setids, 'setid')):
+            if column[j]:
+                attrs[key] = self.string(column[j] - 1)
+        return self.string(self.names[j]), attrs
+
+    def close(self):
+        """Release the views, close the block and, if ``owner`` is set,
+        unlink it.
+
+        """
+        if self._block is None:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._block.close()
+        if self.owner:
+            self._block.unlink()
+        self._block = None
+
+
+def _decode(cls, chunk):
+    """Decode ``chunk`` (decklist strings) with ``cls`` into a shared
+    memory block; return its name and the decoding errors by index.
+
+    """
+    decoder = cls()
+    decks, errors = [], {}
+    for i, string in enumerate(chunk):
+        try:
+            decks.append(decoder.loads(string))
+        except Exception as _:  # pylint: disable=W0703
+            decks.append([])
+            errors[i] = _
+    return pack(decks), errors
+
+
+def _discard(futures):
+    """Unlink the blocks of ``futures`` nobody took over."""
+    for future in futures:
+        if not future.cancelled() and future.exception() is None:
+            SharedDecks(future.result()[0]).close()
+
+
+def _map_shared(task, chunks, workers, window):
+    with ProcessPoolExecutor(workers) as pool:
+        for name, errors in ordered(pool, task, chunks, window, _discard):
+            yield SharedDecks(name, errors=errors)
+
+
+def map_loads_shared(strings, cls=AutoDecoder, workers=None, chunksize=256,
+                     window=None):
+    """Decode ``strings`` (containing MTG decklists) with ``cls`` in a
+    process pool, yielding a ``SharedDecks`` per chunk of ``chunksize``
+    decks, in order.
+
+    At most ``window`` chunks (by default, twice the number of workers) are
+    pending at once: ``strings`` is consumed, and blocks are created, as
+    results are. Decks that failed to decode are empty, with their
+    exception in ``errors``. Close each ``SharedDecks`` when done with it;
+    blocks not yielded yet are unlinked if the iteration stops early.
+
+    """
+    _check()
+    return _map_shared(partial(_decode, cls), chunked(strings, chunksize),
+                       workers, window_size(window, workers))
@@ -0,0 +1,150 @@
+"""MinHash and LSH deck similarity for mtgdeck.
+
+A deck is seen as the multiset of its cards: each copy of a card in a
+section is a distinct token, so that the Jaccard similarity of two token
+sets weighs cards by their count. ``MinHash`` turns a deck into a
+fixed-size signature whose positions agree with a probability equal to
+that similarity. ``LSHIndex`` buckets signatures by bands, so that
+similar decks are found without comparing every pair.
+
+"""
+import random
+from array import array
+from collections import defaultdict
+from hashlib import blake2b
+from itertools import combinations
+
+from .normalize import canonical_section
+
+PRIME = (1 << 61) - 1
+
+
+def _hash(token):
+    return int.from_bytes(blake2b(token.encode('utf-8'),
+                                  digest_size=8).digest(), 'little')
+
+
+def tokens(obj):
+    """Yield the tokens of ``obj`` (a sequence of ``(card name (str),
+    attributes (dict))``): one per copy of each card in each section.
+
+    Duplicate entries add up.
+
+    """
+    counts = defaultdict(int)
+    for name, attrs in obj:
+        counts[canonical_section(attrs), name.casefold()] += attrs['count']
+    for (section, name), count in counts.items():
+        for copy in range(count):
+            yield '{}\t{}\t{}'.format(section, name, copy)
+
+
+class MinHash(object):
+    """Compute MinHash signatures of ``permutations`` values, using
+    universal hash functions ``(a * x + b) mod PRIME`` drawn from ``seed``.
+
+    Signatures are only comparable when computed with the same parameters.
+
+    """
+
+    def __init__(self, permutations=128, seed=1):
+        rng = random.Random(seed)
+        self.permutations = permutations
+        self.params = [(rng.randrange(1, PRIME), rng.randrange(PRIME))
+                       for _ in range(permutations)]
+
+    def signature(self, obj):
+        """Return the signature of ``obj`` as an ``array`` of uint64.
+
+        Each token is hashed once; its permutations are then computed for
+        all tokens at once, one ``min()`` per permutation.
+
+        """
+        hashes = [_hash(token) for token in tokens(obj)]
+        if not hashes:
+            return array('Q', [PRIME] * self.permutations)
+        return array('Q', (min([(a * x + b) % PRIME for x in hashes])
+                           for a, b in self.params))
+
+
+def similarity(left, right):
+    """Return the estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(left, right)) / len(left)
+
+
+class LSHIndex(object):
+    """Locality-sensitive hashing index of deck signatures computed with
+    ``minhash``, split in ``bands`` bands.
+
+    Two decks become candidates when all the values of one of their bands
+    agree, which happens with probability ``1 - (1 - s ** r) ** bands`` for
+    a similarity ``s`` and ``r`` values per band.
+
+    """
+
+    def __init__(self, minhash=None, bands=32):
+        self.minhash = minhash or MinHash()
+        if self.minhash.permutations % bands:
+            raise ValueError('{} bands do not divide {} permutations'
+                             .format(bands, self.minhash.permutations))
+        self.bands = bands
+        self.rows = self.minhash.permutations // bands
+        self.signatures = {}
+        self.buckets = defaultdict(list)
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _bands(self, signature):
+        """Yield the bucket keys of ``signature``."""
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows].tobytes()
+
+    def add(self, key, obj):
+        """Index ``obj`` (a decoded deck) under ``key``; return its
+        signature.
+
+        """
+        if key in self.signatures:
+            raise KeyError('Duplicate key {!r}'.format(key))
+        signature = self.minhash.signature(obj)
+        self.signatures[key] = signature
+        for bucket in self._bands(signature):
+            self.buckets[bucket].append(key)
+        return signature
+
+    def query(self, obj, limit=10, threshold=0.0):
+        """Return up to ``limit`` ``(similarity, key)`` pairs for the indexed
+        decks most similar to ``obj``, at least ``threshold`` similar, most
+        similar first.
+
+        """
+        signature = self.minhash.signature(obj)
+        candidates = set()
+        for bucket in self._bands(signature):
+            candidates.update(self.buckets.get(bucket, ()))
+        results = [(similarity(signature, self.signatures[key]), key)
+                   for key in candidates]
+        results = [result for result in results if result[0] >= threshold]
+        results.sort(key=lambda result: -result[0])
+        return results[:limit]
+
+    def pairs(self, threshold=0.0):
+        """Yield ``(key, key, similarity)`` for each candidate pair of
+        indexed decks at least ``threshold`` similar, once.
+
+        Only pairs sharing a bucket are compared, so the cost grows with the
+        number of decks and the size of buckets rather than the number of
+        pairs.
+
+        """
+        seen = set()
+        for keys in self.buckets.values():
+            for pair in combinations(keys, 2):
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                score = similarity(*map(self.signatures.get, pair))
+                if score >= threshold:
+                    yield pair + (score,)
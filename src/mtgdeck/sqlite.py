@@ -0,0 +1,182 @@
+"""Bulk SQLite import and export for mtgdeck.
+
+Decks are stored in a normalized schema: a ``deck`` table, a ``card`` name
+dimension table, and an ``entry`` table referencing both, one row per
+``(card name, attributes)`` entry, in deck order. Inserts are batched with
+``executemany()``, one transaction per batch, and card ids are cached in
+memory, so that importing does not cost a query per entry.
+
+"""
+import os
+from itertools import groupby, islice
+from operator import itemgetter
+
+from .compression import decompress
+from .decoder import AutoDecoder
+from .encoder import MagicOnlineEncoder
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deck (
+    id INTEGER PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS card (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS entry (
+    deck INTEGER NOT NULL REFERENCES deck (id),
+    position INTEGER NOT NULL,
+    card INTEGER NOT NULL REFERENCES card (id),
+    count INTEGER NOT NULL,
+    section TEXT,
+    setid TEXT,
+    PRIMARY KEY (deck, position)
+) WITHOUT ROWID;
+"""
+
+_SELECT = """
+SELECT deck.id, deck.name, card.name, entry.count, entry.section,
+       entry.setid
+FROM deck LEFT JOIN entry ON entry.deck = deck.id
+LEFT JOIN card ON card.id = entry.card
+ORDER BY deck.id, entry.position
+"""
+
+
+_NEXT_ID = {'card': 'SELECT COALESCE(MAX(id), 0) + 1 FROM card',
+            'deck': 'SELECT COALESCE(MAX(id), 0) + 1 FROM deck'}
+
+
+def _next_id(con, table):
+    return con.execute(_NEXT_ID[table]).fetchone()[0]
+
+
+class Importer(object):
+    """Insert decks into the SQLite database ``con`` (a ``sqlite3``
+    connection), ``size`` decks per transaction.
+
+    """
+
+    def __init__(self, con, size=1000):
+        self.con = con
+        self.size = size
+        con.executescript(SCHEMA)
+        self.cards = dict(con.execute('SELECT name, id FROM card'))
+        self.card = _next_id(con, 'card')
+        self.deck = _next_id(con, 'deck')
+
+    def _card(self, name, cards):
+        """Return the id of card ``name``, recording it in ``cards`` if it
+        is new.
+
+        """
+        if name not in self.cards:
+            self.cards[name] = self.card
+            cards.append((self.card, name))
+            self.card += 1
+        return self.cards[name]
+
+    def _rows(self, batch):
+        """Return the new card, deck and entry rows for ``batch`` (a list of
+        ``(deck name, obj)``).
+
+        """
+        cards, decks, entries = [], [], []
+        for name, obj in batch:
+            decks.append((self.deck, name))
+            entries.extend((self.deck, position, self._card(card, cards),
+                            attrs['count'], attrs.get('section'),
+                            attrs.get('setid'))
+                           for position, (card, attrs) in enumerate(obj))
+            self.deck += 1
+        return cards, decks, entries
+
+    def _insert(self, batch):
+        """Insert ``batch`` in a single transaction; return the ids of the
+        new decks.
+
+        If it fails, the card cache and ids are rolled back along with the
+        transaction.
+
+        """
+        state, cache = (self.card, self.deck), dict(self.cards)
+        try:
+            cards, decks, entries = self._rows(batch)
+            with self.con:
+                self.con.executemany('INSERT INTO card VALUES (?, ?)', cards)
+                self.con.executemany('INSERT INTO deck VALUES (?, ?)', decks)
+                self.con.executemany(
+                    'INSERT INTO entry VALUES (?, ?, ?, ?, ?, ?)', entries)
+        except Exception:
+            (self.card, self.deck), self.cards = state, cache
+            raise
+        return [deck for deck, _ in decks]
+
+    def insert(self, decks):
+        """Insert ``decks`` (an iterable of ``(deck name (str), obj)``,
+        ``obj`` being a sequence of ``(card name (str), attributes
+        (dict))``); return the ids of the new decks.
+
+        """
+        decks = iter(decks)
+        ids = []
+        batch = list(islice(decks, self.size))
+        while batch:
+            ids.extend(self._insert(batch))
+            batch = list(islice(decks, self.size))
+        return ids
+
+
+def _attrs(row):
+    attrs = {'count': row[3]}
+    if row[4] is not None:
+        attrs['section'] = row[4]
+    if row[5] is not None:
+        attrs['setid'] = row[5]
+    return row[2], attrs
+
+
+def select(con):
+    """Yield ``(deck id, deck name, obj)`` for each deck in the SQLite
+    database ``con``, streaming.
+
+    """
+    rows = con.execute(_SELECT)
+    for (deck, name), group in groupby(rows, itemgetter(0, 1)):
+        yield deck, name, [_attrs(row) for row in group if row[2] is not None]
+
+
+def import_files(con, paths, cls=AutoDecoder, size=1000):
+    """Decode the decklist files at ``paths`` with ``cls`` and insert them
+    into ``con``, named after their path; return the new deck ids.
+
+    """
+    decoder = cls()
+
+    def decks():
+        for path in paths:
+            with open(path, encoding='utf-8') as fin:
+                yield path, decoder.load(decompress(fin))
+    return Importer(con, size).insert(decks())
+
+
+def export_files(con, directory, cls=MagicOnlineEncoder):
+    """Encode each deck in ``con`` with ``cls`` to a file in ``directory``,
+    named after its id and name (ie: ``12-deck.txt``) with the extension of
+    ``cls``; return the paths written.
+
+    The id keeps decks with the same name (or file name) apart.
+
+    """
+    encoder = cls()
+    paths = []
+    for deck, name, obj in select(con):
+        base = str(deck)
+        if name:
+            base += '-' + os.path.splitext(os.path.basename(name))[0]
+        path = os.path.join(directory, base + encoder.extension)
+        with open(path, 'w', encoding='utf-8') as fout:
+            encoder.dump(obj, fout)
+        paths.append(path)
+    return paths
@@ -0,0 +1,152 @@
+"""Framed stream conversion for mtgdeck.
+
+A ``Server`` reads conversion requests from a binary stream and writes a
+response for each, so that a single long-lived process (ie: ``mtgdeck
+--stream``) can serve many conversions without paying start-up costs each
+time. Decoder and encoder instances are created once per format, on first
+use, and reused.
+
+A request is a header line followed by a payload::
+
+    DECODER ENCODER LENGTH\\n
+    LENGTH bytes of decklist
+
+where ``DECODER`` and ``ENCODER`` are format names (ie: ``auto``, ``text``,
+``cod``). A response is either::
+
+    ok LENGTH\\n
+    LENGTH bytes of encoded decklist
+
+or, if the conversion failed::
+
+    error LENGTH\\n
+    LENGTH bytes of UTF-8 error message
+
+A malformed header, or one longer than ``Server.max_header`` bytes or
+announcing more than ``Server.max_length`` bytes, gets an error response and
+ends the stream, as the following requests cannot be framed anymore.
+
+"""
+from .base.decoder import BinaryDecoder
+from .decoder import CompactDecoder
+from .normalize import normalize
+
+
+class FrameError(ValueError):
+    """Malformed request frame exception."""
+
+
+class Server(object):
+    """Serve conversion requests with the ``decoders`` and ``encoders``
+    classes (``dict`` of format name to class).
+
+    If ``merge`` or ``sort`` are set, decks are normalized before encoding.
+
+    """
+
+    max_header = 1024
+    max_length = 64 * 1024 * 1024
+
+    def __init__(self, decoders, encoders, merge=False, sort=False):
+        self.classes = {'decoder': decoders, 'encoder': encoders}
+        self.codecs = {'decoder': {}, 'encoder': {}}
+        self.merge = merge
+        self.sort = sort
+
+    def codec(self, kind, name):
+        """Return the cached ``kind`` (``decoder`` or ``encoder``) instance
+        for format ``name``.
+
+        """
+        codecs = self.codecs[kind]
+        if name not in codecs:
+            if name not in self.classes[kind]:
+                raise KeyError('Unknown {} "{}"'.format(kind, name))
+            codecs[name] = self.classes[kind][name]()
+        return codecs[name]
+
+    def convert(self, decoder, encoder, payload):
+        """Convert ``payload`` (``bytes``) from format ``decoder`` to format
+        ``encoder``; return the result as ``bytes``.
+
+        """
+        decoder = self.codec('decoder', decoder)
+        encoder = self.codec('encoder', encoder)
+        if not (isinstance(decoder, BinaryDecoder) or
+                payload.startswith(CompactDecoder.magic)):
+            payload = payload.decode('utf-8')
+
+        deck = decoder.loads(payload)
+        if self.merge or self.sort:
+            deck = normalize(deck, self.merge, self.sort)
+        result = encoder.dumps(deck)
+        return result.encode('utf-8') if isinstance(result, str) else result
+
+    def response(self, request):
+        """Return the ``(status, payload)`` response to ``request``."""
+        try:
+            return 'ok', self.convert(*request)
+        except Exception as _:  # pylint: disable=W0703
+            return 'error', str(_).encode('utf-8')
+
+    @classmethod
+    def header(cls, header):
+        """Return ``(decoder, encoder, length)`` from the ``header`` line."""
+        if len(header) > cls.max_header:
+            raise FrameError('Header longer than {} bytes'.format(
+                cls.max_header))
+        try:
+            decoder, encoder, length = header.decode('ascii').split()
+            length = int(length)
+        except ValueError as _:
+            raise FrameError('Malformed header {!r}'.format(header)) from _
+        if not 0 <= length <= cls.max_length:
+            raise FrameError('Invalid payload length {}'.format(length))
+        return decoder, encoder, length
+
+    @classmethod
+    def request(cls, fin):
+        """Read a request from ``fin``; return ``(decoder, encoder,
+        payload)``, or ``None`` at the end of the stream.
+
+        """
+        header = fin.readline(cls.max_header + 1)
+        if not header:
+            return None
+        decoder, encoder, length = cls.header(header)
+        payload = fin.read(length)
+        if len(payload) != length:
+            raise FrameError('Truncated payload')
+        return decoder, encoder, payload
+
+    @staticmethod
+    def respond(fout, status, payload):
+        """Write a ``status`` response with ``payload`` to ``fout``."""
+        fout.write('{} {}\n'.format(status, len(payload)).encode('ascii'))
+        fout.write(payload)
+        fout.flush()
+
+    def handle(self, fin, fout):
+        """Serve a request from ``fin`` to ``fout``; return whether the
+        stream goes on.
+
+        """
+        try:
+            request = self.request(fin)
+        except FrameError as _:
+            self.respond(fout, 'error', str(_).encode('utf-8'))
+            return False
+        if request is None:
+            return False
+        self.respond(fout, *self.response(request))
+        return True
+
+    def serve(self, fin, fout):
+        """Serve requests from ``fin`` to ``fout`` (binary file-like objects)
+        until the end of ``fin``; return the number of requests served.
+
+        """
+        served = 0
+        while self.handle(fin, fout):
+            served += 1
+        return served
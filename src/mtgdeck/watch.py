@@ -0,0 +1,214 @@
+"""Directory synchronization for mtgdeck.
+
+A ``Watcher`` keeps a target tree of encoded decklists in sync with a
+source tree of decklists, polling it for changes. A manifest in the target
+directory records, for each source file, its size, modification time and
+content hash, plus the modification time of the output written for it.
+
+A sync only stats unchanged files. A file is read and hashed only when its
+stat changed, and converted again only when its content changed, or when its
+output went missing or was modified behind our back. The output of a file
+that fails to convert, or that was removed, is removed too.
+
+"""
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import time
+
+from .compression import decompress
+from .decoder import AutoDecoder
+from .encoder import MagicOnlineEncoder
+
+MANIFEST = '.mtgdeck-manifest.json'
+
+
+def _mtime(path):
+    """Return the modification time of ``path`` in nanoseconds, or
+    ``None`` if it does not exist.
+
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _remove(path):
+    """Remove the file at ``path``, if any."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Watcher(object):
+    """Convert files matching ``pattern`` under ``source`` to ``target`` with
+    a single ``decoder`` and ``encoder`` instance.
+
+    Outputs mirror the source tree, with the file extension of the encoder.
+    Source files that map to the same output (ie: ``a.txt`` and ``a.dek``)
+    collide: only the first, in name order, is converted.
+
+    """
+
+    def __init__(self, source, target, decoder=AutoDecoder,
+                 encoder=MagicOnlineEncoder, pattern='*'):
+        self.source = source
+        self.target = target
+        self.pattern = pattern
+        self.decoder = decoder()
+        self.encoder = encoder()
+        self.path = os.path.join(target, MANIFEST)
+        self.manifest = self._load()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as fin:
+                return json.load(fin)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fout:
+            json.dump(self.manifest, fout)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def scan(self):
+        """Yield ``(name, os.stat_result)`` for each source file, ``name``
+        being its path relative to ``source``.
+
+        The target directory, if under ``source``, is skipped, and so are
+        manifests and temporary files.
+
+        """
+        target = os.path.realpath(self.target)
+        for root, dirs, files in os.walk(self.source):
+            dirs[:] = [name for name in dirs if os.path.realpath(
+                os.path.join(root, name)) != target]
+            for name in sorted(fnmatch.filter(files, self.pattern)):
+                if name == MANIFEST or name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, self.source), os.stat(path)
+
+    def output(self, name):
+        """Return the output path for the source file ``name``."""
+        return os.path.join(self.target,
+                            os.path.splitext(name)[0] + self.encoder.extension)
+
+    def _changed(self, name, stat):
+        """Return ``(content, hash)`` of ``name`` if it needs converting,
+        else ``None``.
+
+        """
+        entry = self.manifest.get(name, {})
+        fresh = entry.get('output') == _mtime(self.output(name))
+        if fresh and entry.get('stat') == [stat.st_size, stat.st_mtime_ns]:
+            return None
+
+        with open(os.path.join(self.source, name), 'rb') as fin:
+            data = fin.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if fresh and entry.get('hash') == digest:
+            entry['stat'] = [stat.st_size, stat.st_mtime_ns]
+            self._dirty = True
+            return None
+        return data, digest
+
+    def convert(self, name, data):
+        """Decode ``data`` (the content of ``name``) and write it encoded to
+        its output path, atomically.
+
+        Return the output modification time.
+
+        """
+        fin = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+        deck = self.decoder.load(decompress(fin))
+
+        path = self.output(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as fout:
+            self.encoder.dump(deck, fout)
+        os.replace(path + '.tmp', path)
+        return _mtime(path)
+
+    def _sync_file(self, name, stat):
+        """Convert ``name`` if needed; return a failure message or ``None``.
+        """
+        changed = self._changed(name, stat)
+        if changed is None:
+            return None
+
+        data, digest = changed
+        entry = {'stat': [stat.st_size, stat.st_mtime_ns], 'hash': digest,
+                 'output': None}
+        self.manifest[name] = entry
+        self._dirty = True
+        try:
+            entry['output'] = self.convert(name, data)
+        except Exception as _:  # pylint: disable=W0703
+            _remove(self.output(name))
+            return str(_)
+        return None
+
+    def _claim(self, outputs, name):
+        """Claim the output of ``name`` in ``outputs`` (output paths to
+        source names); return a failure message if it is already claimed.
+
+        """
+        path = self.output(name)
+        if path in outputs:
+            return 'Output {} collides with {}'.format(path, outputs[path])
+        outputs[path] = name
+        return None
+
+    def _forget(self, name, outputs):
+        """Forget ``name``, removing its output unless claimed in
+        ``outputs``.
+
+        """
+        del self.manifest[name]
+        self._dirty = True
+        if self.output(name) not in outputs:
+            _remove(self.output(name))
+
+    def sync(self):
+        """Convert added or changed source files, and forget removed ones,
+        removing their outputs.
+
+        Return a list of ``(name, error message)`` for the files that failed
+        to convert, or collide with another. Files that failed to convert
+        are not retried until they change, and their stale output is
+        removed; collisions are reported on every sync.
+
+        """
+        os.makedirs(self.target, exist_ok=True)
+        failures = []
+        outputs = {}
+        for name, stat in self.scan():
+            error = self._claim(outputs, name) or self._sync_file(name, stat)
+            if error is not None:
+                failures.append((name, error))
+
+        for name in set(self.manifest) - set(outputs.values()):
+            self._forget(name, outputs)
+        if self._dirty:
+            self._save()
+        return failures
+
+    def watch(self, interval=1.0, count=None):
+        """Call ``sync()`` every ``interval`` seconds, ``count`` times (or
+        forever), yielding its failures.
+
+        """
+        while count is None or count > 0:
+            yield self.sync()
+            count = None if count is None else count - 1
+            if count != 0:
+                time.sleep(interval)
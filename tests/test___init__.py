@@ -1,6 +1,10 @@
 from unittest import TestCase
 
-from mtgdeck.__init__ import (dumps, loads)
+import gzip
+import lzma
+from io import BytesIO, StringIO
+from mtgdeck.__init__ import (dump, dump_many, dumps, dumps_many, load, loads)
+from mtgdeck.encoder import (MagicWorkstationEncoder, MagicOnlineEncoder)
 
 
 class TestInit(TestCase):
@@ -15,3 +19,39 @@ class TestInit(TestCase):
         expected = '1 mname\n'
         actual = dumps(obj)
         self.assertEqual(expected, actual)
+
+    def test_load(self):
+        fp = BytesIO(gzip.compress(b'1 mname\n'))
+        expected = [('mname', {'count': 1})]
+        actual = load(fp)
+        self.assertListEqual(expected, actual)
+
+    def test_dump(self):
+        obj = [('mname', {'count': 1})]
+        fp = BytesIO()
+        fp.name = 'output.txt.gz'
+        dump(obj, fp)
+        self.assertEqual(b'1 mname\n', gzip.decompress(fp.getvalue()))
+
+        fp = BytesIO()
+        dump(obj, fp, compression='xz')
+        self.assertEqual(b'1 mname\n', lzma.decompress(fp.getvalue()))
+
+    def test_dumps_many(self):
+        obj = iter([('mname', {'count': 1, 'section': 'Sideboard'})])
+        expected = ['Sideboard\n1 mname\n', 'SB: 1 mname\n']
+        actual = dumps_many(obj, [MagicOnlineEncoder,
+                                  MagicWorkstationEncoder])
+        self.assertListEqual(expected, actual)
+
+    def test_dump_many(self):
+        obj = iter([('mname', {'count': 1})])
+        fps = [BytesIO(), BytesIO()]
+        dump_many(obj, [(MagicOnlineEncoder, fps[0]),
+                        (MagicWorkstationEncoder, fps[1])],
+                  compression='gz')
+        self.assertEqual(b'1 mname\n', gzip.decompress(fps[0].getvalue()))
+        self.assertEqual(b'1 mname\n', gzip.decompress(fps[1].getvalue()))
+
+        with self.assertRaises(KeyError):
+            dump_many([('mname', {})], [(MagicOnlineEncoder, StringIO())])
@@ -1,10 +1,14 @@
 from unittest import TestCase
 
+import gzip
 from tempfile import mkdtemp
+import zipfile
 from os import unlink, path, rmdir
+from shutil import rmtree
 from sys import (stdin, stdout)
 from argparse import Namespace
-from mtgdeck.__main__ import (action, main, parse_arguments)
+from unittest.mock import patch
+from mtgdeck.__main__ import (action, main, output_path, parse_arguments)
 from mtgdeck import (AutoDecoder,
                      MagicOnlineEncoder,
                      MagicWorkstationDecoder,
@@ -24,7 +28,7 @@ class TestClassAction(TestCase):
         decoder_action_obj = self.decoder_action(None, 'dest')
 
         self.assertCountEqual(
-            ['default', 'auto', 'text', 'mws', 'cod', 'octgn'],
+            ['default', 'auto', 'text', 'mws', 'cod', 'octgn', 'bin'],
             decoder_action_obj.choices
         )
         self.assertEqual(AutoDecoder, decoder_action_obj.default)
@@ -32,7 +36,7 @@ class TestClassAction(TestCase):
         encoder_action_obj = self.encoder_action(None, 'dest')
 
         self.assertCountEqual(
-            ['default', 'text', 'mws', 'cod', 'octgn'],
+            ['default', 'text', 'mws', 'cod', 'octgn', 'bin'],
             encoder_action_obj.choices
         )
         self.assertEqual(MagicOnlineEncoder, encoder_action_obj.default)
@@ -48,6 +52,24 @@ class TestClassAction(TestCase):
         encoder.__call__(None, ns, 'default')
         self.assertEqual(MagicOnlineEncoder, ns.dest)
 
+        encoder = action('encoder', many=True)(None, 'dest')
+        self.assertIn('text,cod', encoder.choices)
+        self.assertNotIn('text,json', encoder.choices)
+        encoder.__call__(None, ns, 'text,cod')
+        self.assertEqual([('text', MagicOnlineEncoder),
+                          ('cod', CockatriceEncoder)], ns.dest)
+
+
+class TestOutputPath(TestCase):
+    def test_output_path(self):
+        template = path.join('root', 'out', '{name}{ext}')
+        self.assertEqual(path.join('root', 'out', 'a', 'b.txt'),
+                         output_path(template, name='a/b', ext='.txt'))
+        with self.assertRaises(ValueError):
+            output_path(template, name='../b', ext='.txt')
+        with self.assertRaises(ValueError):
+            output_path('{name}{ext}', name='/b', ext='.txt')
+
 
 class TestMain(TestCase):
     def setUp(self):
@@ -118,3 +140,160 @@ class TestMain(TestCase):
             actual = fp.read()
 
         self.assertEqual(expected, actual)
+
+    def test_main_binary(self):
+        with open(self.test_input_file, 'w') as fp:
+            fp.write('1 mname\nSideboard\n2 sname\n')
+
+        with self.assertRaises(SystemExit):
+            main(['-e', 'bin',
+                  '-i', self.test_input_file,
+                  '-o', self.test_output_file])
+
+        with open(self.test_output_file, 'rb') as fp:
+            self.assertTrue(fp.read().startswith(b'MTGB'))
+
+        with self.assertRaises(SystemExit):
+            main(['-d', 'bin',
+                  '-i', self.test_output_file,
+                  '-o', self.test_input_file])
+
+        with open(self.test_input_file) as fp:
+            self.assertEqual('1 mname\nSideboard\n2 sname\n', fp.read())
+
+    def test_main_binary_auto(self):
+        with open(self.test_input_file, 'w') as fp:
+            fp.write('300 mname\nSideboard\n2 sname\n')
+
+        with self.assertRaises(SystemExit):
+            main(['-e', 'bin',
+                  '-i', self.test_input_file,
+                  '-o', self.test_output_file])
+
+        with self.assertRaises(SystemExit):
+            main(['-i', self.test_output_file,
+                  '-o', self.test_input_file])
+
+        with open(self.test_input_file) as fp:
+            self.assertEqual('300 mname\nSideboard\n2 sname\n', fp.read())
+
+    def test_main_compressed(self):
+        with open(self.test_input_file, 'wb') as fp:
+            fp.write(gzip.compress(b'1 mname\n'))
+
+        with self.assertRaises(SystemExit):
+            main(['-z', 'gz',
+                  '-i', self.test_input_file,
+                  '-o', self.test_output_file])
+
+        with open(self.test_output_file, 'rb') as fp:
+            self.assertEqual(b'1 mname\n', gzip.decompress(fp.read()))
+
+    def test_main_watch(self):
+        with open(self.test_input_file, 'w') as fp:
+            fp.write('1 mname\n')
+        open(self.test_output_file, 'w').close()
+        target = mkdtemp()
+
+        with self.assertRaises(SystemExit):
+            main(['-e', 'mws', '--once', '-w', self.test_dir, target])
+
+        with open(path.join(target, 'input.mwDeck')) as fp:
+            self.assertEqual('1 mname\n', fp.read())
+        rmtree(target)
+
+    def test_main_fan_out(self):
+        with open(self.test_input_file, 'w') as fp:
+            fp.write('1 mname\nSideboard\n1 sname\n')
+        open(self.test_output_file, 'w').close()
+        template = path.join(self.test_dir, 'out-{format}-{name}{ext}')
+
+        with self.assertRaises(SystemExit):
+            main(['-e', 'text,mws,octgn',
+                  '-t', template,
+                  '-i', self.test_input_file])
+
+        outputs = [template.format(format='text', name='input', ext='.txt'),
+                   template.format(format='mws', name='input',
+                                   ext='.mwDeck'),
+                   template.format(format='octgn', name='input', ext='.o8d')]
+        with open(outputs[0]) as fp:
+            self.assertEqual('1 mname\nSideboard\n1 sname\n', fp.read())
+        with open(outputs[1]) as fp:
+            self.assertEqual('1 mname\nSB: 1 sname\n', fp.read())
+        with open(outputs[2]) as fp:
+            self.assertIn('>sname<', fp.read())
+        for output in outputs:
+            unlink(output)
+
+    def test_main_archive(self):
+        archive = path.join(self.test_dir, 'decks.zip')
+        with zipfile.ZipFile(archive, 'w') as fp:
+            fp.writestr('a/one.txt', '1 mname\n')
+            fp.writestr('two.mwDeck', 'SB: 2 sname\n')
+            fp.writestr('bad.txt', 'invalid')
+            fp.writestr('../escaped.txt', '1 mname\n')
+            fp.writestr('/absolute.txt', '1 mname\n')
+        open(self.test_output_file, 'w').close()
+        target = mkdtemp()
+
+        with self.assertRaises(SystemExit):
+            main(['-e', 'mws', '-a', archive,
+                  '-t', path.join(target, '{name}-{format}{ext}')])
+
+        with open(path.join(target, 'a', 'one-mws.mwDeck')) as fp:
+            self.assertEqual('1 mname\n', fp.read())
+        with open(path.join(target, 'two-mws.mwDeck')) as fp:
+            self.assertEqual('SB: 2 sname\n', fp.read())
+        self.assertFalse(path.exists(path.join(target, 'bad-mws.mwDeck')))
+        self.assertFalse(path.exists(path.join(target, '..',
+                                               'escaped-mws.mwDeck')))
+        self.assertFalse(path.exists('/absolute-mws.mwDeck'))
+        rmtree(target)
+        unlink(archive)
+
+    def test_main_job(self):
+        with open(self.test_input_file, 'w') as fp:
+            fp.write('1 mname\n')
+        open(self.test_output_file, 'w').close()
+        target = mkdtemp()
+
+        for _ in range(2):
+            with self.assertRaises(SystemExit):
+                main(['-e', 'mws', '--every', '1', '-j', target,
+                      '--root', self.test_dir, self.test_dir])
+
+        with open(path.join(target, 'input.mwDeck')) as fp:
+            self.assertEqual('1 mname\n', fp.read())
+        rmtree(target)
+
+    def test_main_job_arguments(self):
+        open(self.test_output_file, 'w').close()
+        for argv in ([self.test_input_file],
+                     ['-j', self.test_dir],
+                     ['--every', '0', '-j', self.test_dir, self.test_dir]):
+            with patch('sys.stderr'), self.assertRaises(SystemExit) as cm:
+                parse_arguments(argv)
+            self.assertEqual(2, cm.exception.code)
+
+    def test_main_encoder_arguments(self):
+        for argv in (['-e', 'text,cod', '--once', '-w', 'src', 'dst'],
+                     ['-e', 'text,cod', '-j', 'dst', 'src'],
+                     ['-e', 'text,cod', '--stream'],
+                     ['-e', 'text,cod', '-o', self.test_output_file],
+                     ['-a', 'decks.zip', '-o', self.test_output_file]):
+            with patch('sys.stderr'), self.assertRaises(SystemExit) as cm:
+                parse_arguments(argv)
+            self.assertEqual(2, cm.exception.code)
+
+    def test_main_normalize(self):
+        with open(self.test_input_file, 'w') as fp:
+            fp.write('1 b\nSB: 1 s\nSB: 1 a\n1 b\n')
+
+        with self.assertRaises(SystemExit):
+            main(['-d', 'mws', '-m', '-s',
+                  '-i', self.test_input_file,
+                  '-o', self.test_output_file])
+
+        with open(self.test_output_file) as fp:
+            self.assertEqual('2 b\nSideboard\n1 a\n1 s\n', fp.read())
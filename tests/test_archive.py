@@ -0,0 +1,80 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from mtgdeck.archive import (Archive, ArchiveWriter)
+from mtgdeck.decoder import MagicOnlineDecoder
+from mtgdeck.encoder import CompactEncoder
+from mtgdeck.fingerprint import fingerprint
+
+
+class TestArchive(TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.decks = [[('mname', {'count': i + 1})] for i in range(50)]
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_archive(self):
+        with open(self.path, 'wb') as fout:
+            with ArchiveWriter(fout) as writer:
+                for i, deck in enumerate(self.decks):
+                    key = 'deck{}'.format(i) if i % 2 else None
+                    self.assertEqual(i, writer.add(deck, key))
+                with self.assertRaises(KeyError):
+                    writer.add([], 'deck1')
+
+        with Archive(self.path, cls=MagicOnlineDecoder) as archive:
+            self.assertEqual(50, len(archive))
+            self.assertEqual('8 mname\n', archive.payload(7))
+            self.assertListEqual(self.decks[49], archive[-1])
+            self.assertListEqual(self.decks[31], archive.get('deck31'))
+            self.assertIsNone(archive.get('deck30'))
+            self.assertIsNone(archive.find(b'zzz'))
+            self.assertListEqual(self.decks, list(archive))
+            with self.assertRaises(IndexError):
+                archive.payload(50)
+
+    def test_archive_binary(self):
+        with open(self.path, 'wb') as fout:
+            with ArchiveWriter(fout, cls=CompactEncoder) as writer:
+                for deck in self.decks:
+                    writer.add(deck, fingerprint(deck))
+
+        with Archive(self.path) as archive:
+            self.assertTrue(archive.payload(0).startswith(b'MTGB'))
+            self.assertListEqual(self.decks[12],
+                                 archive.get(fingerprint(self.decks[12])))
+
+    def test_archive_encode_error(self):
+        with open(self.path, 'wb') as fout:
+            with ArchiveWriter(fout) as writer:
+                with self.assertRaises(KeyError):
+                    writer.add([('mname', {})], 'bad')
+                self.assertEqual(0, writer.add(self.decks[0], 'good'))
+
+        with Archive(self.path) as archive:
+            self.assertEqual(1, len(archive))
+            self.assertIsNone(archive.get('bad'))
+            self.assertListEqual(self.decks[0], archive.get('good'))
+
+    def test_archive_position(self):
+        with open(self.path, 'wb') as fout:
+            fout.write(b'prefix')
+            with self.assertRaises(ValueError):
+                ArchiveWriter(fout)
+
+    def test_archive_empty(self):
+        with open(self.path, 'wb') as fout:
+            ArchiveWriter(fout).close()
+        with Archive(self.path) as archive:
+            self.assertEqual(0, len(archive))
+            self.assertIsNone(archive.find('deck'))
+
+    def test_archive_invalid(self):
+        with open(self.path, 'wb') as fout:
+            fout.write(b'garbage')
+        with self.assertRaises(ValueError):
+            Archive(self.path)
@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from mtgdeck.bulk import (imap, map_dumps, map_loads)
+from mtgdeck.decoder import (DecodeError, MagicOnlineDecoder)
+from mtgdeck.encoder import OCTGNEncoder
+
+
+def _invert(value):
+    return 1 / value
+
+
+class TestImap(TestCase):
+    def test_imap(self):
+        for executor in ('serial', 'thread', 'process'):
+            actual = list(imap(_invert, [1, 0, 2, 4], executor=executor,
+                               workers=2, chunksize=3))
+            self.assertListEqual([1, 0.5, 0.25], actual[:1] + actual[2:])
+            self.assertIsInstance(actual[1], ZeroDivisionError)
+
+    def test_imap_executor(self):
+        with self.assertRaises(ValueError):
+            imap(_invert, [], executor='cluster')
+        with self.assertRaises(ValueError):
+            imap(_invert, [], window=0)
+
+    def test_imap_window(self):
+        consumed = []
+
+        def items():
+            for i in range(1, 100):
+                consumed.append(i)
+                yield i
+        results = imap(_invert, items(), executor='thread', workers=1,
+                       chunksize=2, window=3)
+        self.assertEqual(1, next(results))
+        self.assertLessEqual(len(consumed), 8)
+        self.assertEqual(98, len(list(results)))
+        self.assertEqual(99, len(consumed))
+
+
+class TestMapLoads(TestCase):
+    def test_map_loads(self):
+        strings = ['{} mname'.format(i) for i in range(100)] + ['invalid']
+        actual = list(map_loads(strings, chunksize=7))
+        self.assertEqual(101, len(actual))
+        for i, deck in enumerate(actual[:-1]):
+            self.assertListEqual([('mname', {'count': i})], deck)
+        self.assertIsInstance(actual[-1], DecodeError)
+
+        actual = list(map_loads(['1 mname'], cls=MagicOnlineDecoder,
+                                executor='serial'))
+        self.assertListEqual([[('mname', {'count': 1})]], actual)
+
+
+class TestMapDumps(TestCase):
+    def test_map_dumps(self):
+        objs = [[('mname', {'count': 1})], [('mname', {})]]
+        actual = list(map_dumps(objs, executor='thread'))
+        self.assertEqual('1 mname\n', actual[0])
+        self.assertIsInstance(actual[1], KeyError)
+
+        actual = list(map_dumps(objs[:1], cls=OCTGNEncoder))
+        self.assertIn('>mname<', actual[0])
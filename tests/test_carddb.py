@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from io import BytesIO
+from tempfile import mkdtemp
+from os import unlink, path, rmdir
+from pickle import dumps, loads
+from mtgdeck.carddb import (CardDatabase, dump, enrich)
+
+
+class TestCardDatabase(TestCase):
+    def setUp(self):
+        self.test_dir = mkdtemp()
+        self.test_db_file = path.join(self.test_dir, 'cards.db')
+        self.cards = {'Lightning Bolt': {'setid': 'M10', 'cmc': 1},
+                      'Tarmogoyf': {'setid': 'FUT'},
+                      'Island': {},
+                      'Æther Vial': {'setid': 'DST'}}
+        with open(self.test_db_file, 'wb') as fp:
+            dump(self.cards, fp)
+        self.db = CardDatabase(self.test_db_file)
+
+    def tearDown(self):
+        self.db.close()
+        unlink(self.test_db_file)
+        rmdir(self.test_dir)
+
+    def test_lazy(self):
+        self.assertEqual(None, self.db._map)
+        self.assertEqual(4, len(self.db))
+        self.assertNotEqual(None, self.db._map)
+
+    def test_get(self):
+        for name, meta in self.cards.items():
+            self.assertDictEqual(dict(meta, name=name), self.db.get(name))
+        self.assertEqual('Tarmogoyf', self.db.get('TARMOGOYF')['name'])
+        self.assertEqual(None, self.db.get('Mountain'))
+        self.assertIn('island', self.db)
+        self.assertNotIn('', self.db)
+
+    def test_pickle(self):
+        self.db.get('Island')
+        db = loads(dumps(self.db))
+        self.assertEqual(None, db._map)
+        self.assertEqual('Island', db.get('Island')['name'])
+        db.close()
+
+    def test_invalid(self):
+        with open(self.test_db_file, 'wb') as fp:
+            fp.write(b'not a database')
+        with self.assertRaises(ValueError):
+            len(CardDatabase(self.test_db_file))
+
+    def test_dump(self):
+        fp = BytesIO()
+        dump({'b': {}, 'A': {}}, fp)
+        self.assertTrue(fp.getvalue().endswith(
+            b'a\t{"name":"A"}\nb\t{"name":"b"}\n'))
+
+
+class TestEnrich(TestCase):
+    def test_enrich(self):
+        db = {'lightning bolt': {'name': 'Lightning Bolt', 'setid': 'M10'}}
+
+        class Database(object):
+            def get(self, name):
+                return db.get(name.casefold())
+
+        obj = [('lightning bolt', {'count': 4}),
+               ('Lightning Bolt', {'count': 1, 'setid': 'LEA'}),
+               ('Mountain', {'count': 20})]
+        expected = [('Lightning Bolt', {'count': 4, 'setid': 'M10'}),
+                    ('Lightning Bolt', {'count': 1, 'setid': 'LEA'}),
+                    ('Mountain', {'count': 20})]
+        actual = list(enrich(obj, Database()))
+        self.assertListEqual(expected, actual)
+
+        with self.assertRaises(KeyError):
+            list(enrich(obj, Database(), strict=True))
@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+import bz2
+import gzip
+import lzma
+from io import BytesIO, StringIO, TextIOWrapper
+from mtgdeck.compression import (compress, decompress, detect, extension)
+
+
+class Unseekable(BytesIO):
+    name = 'input.txt.xz'
+
+    def seekable(self):
+        return False
+
+
+class TestCompression(TestCase):
+    def setUp(self):
+        self.string = '4 Æther Vial\n'
+        self.data = self.string.encode('utf-8')
+
+    def test_extension(self):
+        fp = BytesIO()
+        self.assertEqual(None, extension(fp))
+        fp.name = 'output.cod.bz2'
+        self.assertEqual('bz2', extension(fp))
+        fp.name = 'output.cod'
+        self.assertEqual(None, extension(fp))
+
+    def test_detect(self):
+        for method, module in (('gz', gzip), ('bz2', bz2), ('xz', lzma)):
+            fp = BytesIO(module.compress(self.data))
+            self.assertEqual(method, detect(fp))
+            self.assertEqual(0, fp.tell())
+        self.assertEqual(None, detect(BytesIO(self.data)))
+        self.assertEqual(None, detect(StringIO(self.string)))
+        self.assertEqual('xz', detect(Unseekable()))
+
+    def test_decompress(self):
+        fp = StringIO(self.string)
+        self.assertIs(fp, decompress(fp))
+
+        fp = TextIOWrapper(BytesIO(gzip.compress(self.data)), 'utf-8')
+        self.assertEqual(self.string, decompress(fp).read())
+
+        stream = decompress(BytesIO(lzma.compress(self.data)))
+        self.assertEqual(self.data, stream.buffer.read())
+
+    def test_compress(self):
+        raw = BytesIO()
+        fp = TextIOWrapper(raw, 'utf-8')
+        with compress(fp, 'bz2') as stream:
+            stream.write(self.string)
+        self.assertFalse(fp.closed)
+        self.assertEqual(self.data, bz2.decompress(raw.getvalue()))
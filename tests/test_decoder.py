@@ -1,14 +1,26 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 from unittest.mock import patch
-from io import StringIO
+from io import BytesIO, StringIO
+from pyparsing import ParseException, ParserElement
+from defusedxml.ElementTree import ParseError
 
 from mtgdeck.decoder import (DecodeError,
+                             LimitError,
+                             Limits,
                              Decoder,
                              AutoDecoder,
+                             MagicOnlineDecoder,
                              MagicWorkstationDecoder,
                              XMLDecoder,
                              OCTGNDecoder,
-                             CockatriceDecoder)
+                             CockatriceDecoder,
+                             CompactDecoder)
+from mtgdeck.base.decoder import packrat
+from mtgdeck.encoder import CompactEncoder
 
 
 class TestDecodeError(TestCase):
@@ -20,6 +32,103 @@ class TestDecodeError(TestCase):
                              str(e))
 
 
+class TestPackrat(TestCase):
+    def test_packrat(self):
+        self.assertFalse(ParserElement._packratEnabled)
+
+        with packrat(0):
+            self.assertFalse(ParserElement._packratEnabled)
+
+        with packrat(16):
+            self.assertTrue(ParserElement._packratEnabled)
+
+        self.assertFalse(ParserElement._packratEnabled)
+
+    def test_decode(self):
+        decoder = MagicWorkstationDecoder()
+        decoder.packrat = 16
+        expected = [('mname', {'count': 1, 'setid': 'SETID'})]
+        actual = decoder.loads('1 [SETID] mname')
+        self.assertListEqual(expected, actual)
+        self.assertFalse(ParserElement._packratEnabled)
+
+    def test_threads(self):
+        def loads(count):
+            decoder = MagicWorkstationDecoder()
+            decoder.packrat = 16
+            return decoder.loads('{} [SETID] mname\n'.format(count) * 50)
+
+        with ThreadPoolExecutor(4) as pool:
+            decks = list(pool.map(loads, range(32)))
+        self.assertListEqual([50] * 32, [len(deck) for deck in decks])
+        self.assertFalse(ParserElement._packratEnabled)
+
+
+class TestLimits(TestCase):
+    def setUp(self):
+        self.text = '1 mname\n2 mname\nSB: 3 sname [[[SETID]]]\n'
+        self.xml = ('<deck><section name="Main"><card qty="1">mname</card>'
+                    '<card qty="2">mname</card></section></deck>')
+
+    def assertLimit(self, limit, decoder, string, value):
+        decoder.limits = Limits(**{limit: value})
+        decoder.loads(string)
+        decoder.limits = Limits(**{limit: value - 1})
+        with self.assertRaises(LimitError) as cm:
+            decoder.loads(string)
+        self.assertEqual(limit, cm.exception.args[0])
+
+    def test_text(self):
+        decoder = MagicWorkstationDecoder()
+        self.assertLimit('max_bytes', decoder, self.text, 40)
+        self.assertLimit('max_entries', decoder, self.text, 3)
+        self.assertLimit('max_line', decoder, self.text, 23)
+        self.assertLimit('max_count', decoder, self.text, 3)
+        self.assertLimit('max_nesting', decoder, self.text, 3)
+
+    def test_xml(self):
+        decoder = OCTGNDecoder()
+        self.assertLimit('max_entries', decoder, self.xml, 2)
+        self.assertLimit('max_count', decoder, self.xml, 2)
+        self.assertLimit('max_nesting', decoder, self.xml, 3)
+
+    def test_binary(self):
+        string = b'MTGB\x01\x00\x02\x00\x01\x02a\x00\x05\x02b'
+        decoder = CompactDecoder()
+        self.assertLimit('max_entries', decoder, string, 2)
+        self.assertLimit('max_count', decoder, string, 5)
+
+    def test_load(self):
+        decoder = AutoDecoder()
+        decoder.limits = Limits(max_bytes=8, max_entries=1)
+        fp = StringIO('1 mname\n' * 1000)
+        with self.assertRaises(LimitError):
+            decoder.load(fp)
+        self.assertEqual(9, fp.tell())
+        decoder.limits = Limits(max_entries=1)
+        with self.assertRaises(LimitError) as cm:
+            decoder.loads('1 mname\n2 mname')
+        self.assertEqual('max_entries', cm.exception.args[0])
+
+    def test_threads(self):
+        # Parse actions are first called in a fresh interpreter, concurrently
+        script = '\n'.join([
+            'from concurrent.futures import ThreadPoolExecutor',
+            'from mtgdeck.decoder import MagicOnlineDecoder',
+            'def loads(_):',
+            '    return MagicOnlineDecoder().loads("1 a\\n2 b\\n")',
+            'with ThreadPoolExecutor(4) as pool:',
+            '    print(len(list(pool.map(loads, range(4)))))'])
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output([sys.executable, '-c', script],
+                                         env=env)
+        self.assertEqual(b'4', output.strip())
+
+    def test___str__(self):
+        self.assertEqual("Decoding limit exceeded: ('max_line', 1, 2)",
+                         str(LimitError('max_line', 1, 2)))
+
+
 class TestDecoder(TestCase):
     @patch.multiple(Decoder, __abstractmethods__=set())
     def setUp(self):
@@ -106,6 +215,44 @@ class TestAutoDecoder(TestCase):
         with self.assertRaises(DecodeError):
             self.decoder.loads('invalid')
 
+        self.assertListEqual([('mname', {'count': 1})],
+                             self.decoder.loads(b'MTGB\x01\x00\x01'
+                                                b'\x00\x01\x0amname'))
+
+
+class TestMagicOnlineDecoder(TestCase):
+    def setUp(self):
+        self.decoder = MagicOnlineDecoder()
+
+    def test_sniff(self):
+        self.decoder.sniff('// comment\n1 mname\n')
+        self.decoder.sniff('Sideboard\n<deck>')
+
+        with self.assertRaises(ParseException) as cm:
+            self.decoder.sniff('\n<deck>\n' + '1 mname\n' * 1000)
+        self.assertEqual((2, 1), (cm.exception.lineno, cm.exception.col))
+
+    def test_loads_lazy(self):
+        string = """// comment
+        1 mname
+        /* block
+           comment */ 2 [X] mname \r
+        Sideboard
+        3 sname"""
+        actual = self.decoder.loads_lazy(string)
+        self.assertListEqual(self.decoder.loads(string), list(actual))
+        self.assertEqual(3, actual.total(sideboard=True))
+
+        with self.assertRaises(ParseException) as cm:
+            self.decoder.loads_lazy('1 mname\n<deck>\n')
+        self.assertEqual(2, cm.exception.lineno)
+
+    def test_loads(self):
+        self.decoder.loads('Sideboard\n1 sname\n')
+        expected = [('mname', {'count': 1})]
+        actual = self.decoder.loads('1 mname\n')
+        self.assertListEqual(expected, actual)
+
 
 class TestMagicWorkstationDecoder(TestCase):
     def setUp(self):
@@ -132,6 +279,27 @@ class TestMagicWorkstationDecoder(TestCase):
 
         self.assertListEqual(expected, actual)
 
+        actual = list(self.decoder.loads_lazy(string))
+        self.assertListEqual(expected, actual)
+
+        self.decoder.limits = Limits(max_entries=4)
+        with self.assertRaises(LimitError):
+            self.decoder.loads_lazy(string)
+
+    def test_loads_lazy(self):
+        for string in ('1 [ABC] mname\nSB: 2 [ DEF ] sname\n',
+                       '1 [A B] mname\n1 [] mname\n1 mname [ABC]\n',
+                       '1 [ABC]mname\n1 \n'):
+            self.assertListEqual(self.decoder.loads(string),
+                                 list(self.decoder.loads_lazy(string)))
+
+        for string in ('1 [[ABC]] mname\n', '1 [ABC] [DEF] mname\n',
+                       '1 [ABC\n'):
+            with self.assertRaises(ParseException):
+                self.decoder.loads(string)
+            with self.assertRaises(ParseException):
+                self.decoder.loads_lazy(string)
+
 
 class TestXMLDecoder(TestCase):
     def test_XMLDecoder(self):
@@ -162,6 +330,174 @@ class TestCockatriceDecoder(TestCase):
     def setUp(self):
         self.decoder = CockatriceDecoder()
 
+    def test_sniff(self):
+        self.decoder.sniff('<cockatrice_deck>')
+
+        with self.assertRaises(ParseError):
+            self.decoder.sniff('1 mname\n')
+
+        # only the head is parsed: the broken tail is never reached
+        string = '<deck>' + '<section name="Main" />' * 10000 + '<<'
+        with self.assertRaises(KeyError) as cm:
+            self.decoder.sniff(string)
+        self.assertIn('found "deck"', str(cm.exception))
+        with self.assertRaises(ParseError):
+            OCTGNDecoder().loads(string)
+
     def test__decode(self):
         with self.assertRaises(KeyError):
             list(self.decoder._decode('<deck></deck>'))
+
+
+class TestCompactDecoder(TestCase):
+    def setUp(self):
+        self.decoder = CompactDecoder(['sname'])
+
+    def test_loads(self):
+        string = (b'MTGB\x01\x01\x09Sideboard\x03'
+                  b'\x00\x01\x0amname'
+                  b'\x80\xac\x02\x05SETID\x0amname'
+                  b'\x81\x02\x01S\x01')
+        expected = [('mname', {'count': 1}),
+                    ('mname', {'count': 300, 'setid': 'SETID'}),
+                    ('sname', {'count': 2, 'setid': 'S',
+                               'section': 'Sideboard'})]
+        self.assertListEqual(expected, self.decoder.loads(string))
+        self.assertListEqual(expected,
+                             self.decoder.load(BytesIO(string)))
+
+    def test_sniff(self):
+        with self.assertRaises(KeyError):
+            self.decoder.loads('MTGB\x01')
+        with self.assertRaises(KeyError):
+            self.decoder.loads(b'1 mname')
+
+    def test_corrupt(self):
+        for string in (b'MTGB\x01\x00\x01\x00\x01\x0amnam',
+                       b'MTGB\x01\x00\x01\x00\x01\x0amname\x00',
+                       b'MTGB\x01\x00\x01\x00\x01\x02\xff'):
+            with self.assertRaises(ValueError):
+                self.decoder.loads(string)
+
+
+class TestPushParser(TestCase):
+    def _push(self, decoder, data, size=3):
+        parser = decoder.parser()
+        entries = []
+        for i in range(0, len(data), size):
+            parser.feed(data[i:i + size])
+            entries.extend(parser.read_entries())
+        parser.close()
+        return entries + parser.read_entries()
+
+    def test_text(self):
+        string = ('// deck\r\n2 mname\r\n/* block\r\ncomment */\r\n'
+                  '\r\nSideboard\r\n1 sname\r\n3 Æther Vial')
+        expected = MagicOnlineDecoder().loads(string)
+        for size in (1, 2, 5, 100):
+            for data in (string, string.encode('utf-8')):
+                self.assertListEqual(
+                    expected, self._push(MagicOnlineDecoder(), data, size))
+                self.assertListEqual(
+                    expected, self._push(AutoDecoder(), data, size))
+
+        for string in ('SB: 1 [ABC] sname\n1 mname\n',
+                       '4 Lightning Bolt\n20 Mountain\nSB: 2 Smash\n',
+                       '1 [ABC] mname\n1 [DEF] sname\n',
+                       '1 [ABC] mname\nSideboard\n1 sname\n',
+                       '1 [ABC] mname\nSB: 1 sname\n'):
+            for size in (1, 4, 100):
+                self.assertListEqual(AutoDecoder().loads(string),
+                                     self._push(AutoDecoder(), string, size))
+
+    def test_auto_incremental(self):
+        parser = AutoDecoder().parser()
+        parser.feed('4 Lightning Bolt\n20 Mountain\n')
+        self.assertListEqual([('Lightning Bolt', {'count': 4}),
+                              ('Mountain', {'count': 20})],
+                             parser.read_entries())
+        parser.feed('1 [ABC] mname\n')
+        self.assertListEqual([], parser.read_entries())
+        parser.feed('SB: 2 Smash\n')
+        self.assertListEqual([('mname', {'count': 1, 'setid': 'ABC'}),
+                              ('Smash', {'count': 2,
+                                         'section': 'Sideboard'})],
+                             parser.read_entries())
+        parser.close()
+        self.assertListEqual([], parser.read_entries())
+
+    def test_text_incremental(self):
+        parser = MagicOnlineDecoder().parser()
+        parser.feed('1 mname\n2 sna')
+        self.assertListEqual([('mname', {'count': 1})],
+                             parser.read_entries())
+        parser.feed('me\r')
+        self.assertListEqual([], parser.read_entries())
+        parser.feed('\n')
+        self.assertListEqual([('sname', {'count': 2})],
+                             parser.read_entries())
+        parser.close()
+        with self.assertRaises(ValueError):
+            parser.feed('1 mname\n')
+
+        parser = MagicOnlineDecoder().parser()
+        with self.assertRaises(ParseException):
+            parser.feed('invalid\n')
+        with self.assertRaises(ParseException):
+            MagicOnlineDecoder().parser().close()
+
+    def test_xml(self):
+        string = """<?xml version="1.0" encoding="UTF-8"?>
+        <cockatrice_deck version="1">
+          <zone name="main"><card number="1" name="mname"/></zone>
+          <zone name="side"><card number="2" name="Æther Vial"/></zone>
+        </cockatrice_deck>"""
+        expected = CockatriceDecoder().loads(string)
+        for size in (1, 7, 1000):
+            self.assertListEqual(
+                expected, self._push(CockatriceDecoder(), string, size))
+            self.assertListEqual(
+                expected, self._push(AutoDecoder(), string.encode('utf-8'),
+                                     size))
+
+        parser = OCTGNDecoder().parser()
+        parser.feed('<deck><section name="Main"><card qty="1">mname</card>')
+        self.assertListEqual([('mname', {'count': 1, 'section': 'Main'})],
+                             parser.read_entries())
+        with self.assertRaises(ParseError):
+            parser.close()
+        with self.assertRaises(KeyError):
+            CockatriceDecoder().parser().feed('<deck>')
+
+    def test_auto(self):
+        with self.assertRaises(DecodeError):
+            AutoDecoder().parser().feed('<unknown>')
+        with self.assertRaises(DecodeError):
+            AutoDecoder().parser().feed('// comment\ninvalid\n')
+        parser = AutoDecoder().parser()
+        parser.feed('/* comment\n')
+        parser.feed('*/ 1 mname')
+        parser.close()
+        self.assertListEqual([('mname', {'count': 1})], parser.read_entries())
+
+    def test_binary(self):
+        data = CompactEncoder().dumps([('mname', {'count': 2})])
+        self.assertListEqual([('mname', {'count': 2})],
+                             self._push(CompactDecoder(), data, 2))
+        parser = CompactDecoder().parser()
+        parser.feed(data[:3])
+        self.assertListEqual([], parser.read_entries())
+        with self.assertRaises(KeyError):
+            parser.close()
+
+    def test_limits(self):
+        decoder = MagicOnlineDecoder()
+        decoder.limits = Limits(max_line=10, max_entries=2)
+        parser = decoder.parser()
+        with self.assertRaises(LimitError):
+            parser.feed('1 ' + 'm' * 20)
+
+        parser = decoder.parser()
+        parser.feed('1 a\n1 b\n')
+        with self.assertRaises(LimitError):
+            parser.feed('1 c\n')
@@ -1,11 +1,12 @@
 from unittest import TestCase
 from unittest.mock import patch
-from io import StringIO
+from io import BytesIO, StringIO, TextIOWrapper
 
 from mtgdeck.base.encoder import (Encoder, TextEncoder, XMLEncoder)
 from mtgdeck.encoder import (EncodeError, MagicOnlineEncoder,
                              MagicWorkstationEncoder, OCTGNEncoder,
-                             CockatriceEncoder)
+                             CockatriceEncoder, CompactEncoder)
+from mtgdeck.decoder import CompactDecoder
 
 
 class TestEncodeError(TestCase):
@@ -64,12 +65,38 @@ class TestMagicOnlineEncoder(TestCase):
         actual = self.encoder._encode(obj)
         self.assertEqual(expected, actual)
 
-        obj = [('mname', {'count': 2})]
+        obj = [('mname', {'count': 2}),
+               ('sname', {'section': 'Sideboard', 'count': 2})]
+
+        expected = """2 mname\nSideboard\n2 sname\n"""
+        actual = self.encoder._encode(obj)
+        self.assertEqual(expected, actual)
+
+        obj = [('sname', {'section': 'Sideboard', 'count': 2}),
+               ('mname', {'count': 2})]
+
+        expected = """2 mname\nSideboard\n2 sname\n"""
+        actual = self.encoder._encode(obj)
+        self.assertEqual(expected, actual)
 
-        expected = """2 mname\n"""
+        obj = [('sname', {'section': 'side', 'count': 2}),
+               ('mname', {'section': 'main', 'count': 2}),
+               ('aname', {'section': 'Main', 'count': 1})]
+
+        expected = """2 mname\n1 aname\nSideboard\n2 sname\n"""
         actual = self.encoder._encode(obj)
         self.assertEqual(expected, actual)
 
+    def test_dumps(self):
+        obj = [('mname', {'count': 2}),
+               ('aname', {'count': 1}),
+               ('mname', {'count': 2})]
+
+        self.encoder.merge = True
+        self.assertEqual("4 mname\n1 aname\n", self.encoder.dumps(obj))
+        self.encoder.sort = True
+        self.assertEqual("1 aname\n4 mname\n", self.encoder.dumps(obj))
+
 
 class TestMagicWorkstationEncoder(TestCase):
     def setUp(self):
@@ -154,3 +181,33 @@ class TestCockatriceEncoder(TestCase):
 
         actual = self.encoder._encode(obj)
         self.assertEqual(expected, actual)
+
+
+class TestCompactEncoder(TestCase):
+    def setUp(self):
+        self.encoder = CompactEncoder(['sname'])
+
+    def test__encode(self):
+        obj = [('mname', {'count': 1}),
+               ('mname', {'count': 300, 'setid': 'SETID'}),
+               ('sname', {'section': 'Sideboard', 'count': 2, 'setid': 'S'})]
+
+        expected = (b'MTGB\x01\x01\x09Sideboard\x03'
+                    b'\x00\x01\x0amname'
+                    b'\x80\xac\x02\x05SETID\x0amname'
+                    b'\x81\x02\x01S\x01')
+        actual = self.encoder._encode(obj)
+        self.assertEqual(expected, actual)
+        self.assertListEqual(obj, CompactDecoder(['sname']).loads(actual))
+
+    def test_dump(self):
+        obj = [('Æther Vial', {'count': 4, 'section': 'main'})]
+        fp = TextIOWrapper(BytesIO(), encoding='ascii')
+        self.encoder.dump(obj, fp)
+        fp.buffer.seek(0)
+        self.assertListEqual(obj, CompactDecoder().load(fp))
+
+    def test_sections(self):
+        obj = [('mname', {'count': 1, 'section': str(i)}) for i in range(128)]
+        with self.assertRaises(EncodeError):
+            self.encoder._encode(obj)
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from mtgdeck.decoder import (CockatriceDecoder, MagicOnlineDecoder)
+from mtgdeck.fingerprint import (SIZE, FingerprintSet, dedup, fingerprint)
+
+
+class TestFingerprint(TestCase):
+    def test_fingerprint(self):
+        text = MagicOnlineDecoder().loads(
+            '2 Island\n1 Forest\n2 Island\nSideboard\n1 Duress\n')
+        xml = CockatriceDecoder().loads(
+            '<cockatrice_deck>'
+            '<zone name="side"><card number="1" name="duress"/></zone>'
+            '<zone name="main"><card number="1" name="Forest"/>'
+            '<card number="4" name="Island"/></zone>'
+            '</cockatrice_deck>')
+        self.assertEqual(SIZE, len(fingerprint(text)))
+        self.assertEqual(fingerprint(text), fingerprint(xml))
+        self.assertEqual(fingerprint(text),
+                         fingerprint([('Island', {'count': 4, 'setid': 'X'}),
+                                      ('Duress', {'count': 1,
+                                                  'section': 'Sideboard'}),
+                                      ('Forest', {'count': 1})]))
+
+        self.assertNotEqual(fingerprint(text), fingerprint(text[:-1]))
+        self.assertNotEqual(fingerprint([('Duress', {'count': 1})]),
+                            fingerprint(text[-1:]))
+        self.assertEqual(bytes(SIZE), fingerprint([]))
+
+
+class TestFingerprintSet(TestCase):
+    def test_add(self):
+        seen = FingerprintSet(capacity=2)
+        keys = [fingerprint([(str(i), {'count': 1})]) for i in range(100)]
+        for key in keys:
+            self.assertTrue(seen.add(key))
+        for key in keys:
+            self.assertFalse(seen.add(key))
+            self.assertIn(key, seen)
+        self.assertEqual(100, len(seen))
+        self.assertNotIn(fingerprint([('x', {'count': 1})]), seen)
+
+        self.assertNotIn(bytes(SIZE), seen)
+        self.assertTrue(seen.add(bytes(SIZE)))
+        self.assertFalse(seen.add(bytes(SIZE)))
+        self.assertIn(bytes(SIZE), seen)
+        self.assertEqual(101, len(seen))
+
+
+class TestDedup(TestCase):
+    def test_dedup(self):
+        decks = [[('a', {'count': 1}), ('b', {'count': 2})],
+                 [('b', {'count': 2}), ('A', {'count': 1})],
+                 [('b', {'count': 1})],
+                 [('b', {'count': 1}), ('b', {'count': 1}),
+                  ('a', {'count': 1})]]
+        self.assertListEqual([decks[0], decks[2]], list(dedup(decks)))
+
+        seen = FingerprintSet()
+        self.assertEqual(2, len(list(dedup(decks, seen))))
+        self.assertListEqual([], list(dedup(decks, seen)))
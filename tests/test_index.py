@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from mtgdeck.index import (And, Card, DeckIndex, IndexBuilder, Or, Query)
+
+
+class TestDeckIndex(TestCase):
+    def setUp(self):
+        decks = [[('Thoughtseize', {'count': 4}),
+                  ('Tarmogoyf', {'count': 2, 'section': 'Sideboard'})],
+                 [('Thoughtseize', {'count': 2}),
+                  ('Thoughtseize', {'count': 2}),
+                  ('Tarmogoyf', {'count': 4})],
+                 [('thoughtseize', {'count': 3}),
+                  ('Tarmogoyf', {'count': 1, 'section': 'side'})],
+                 [('Island', {'count': 20, 'section': 'Main'})]]
+        builder = IndexBuilder()
+        self.assertListEqual([0, 1, 2, 3],
+                             [builder.add(deck) for deck in decks])
+
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as fout:
+            builder.dump(fout)
+        self.index = DeckIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        os.remove(self.path)
+
+    def test_search(self):
+        self.assertEqual(4, len(self.index))
+        search = self.index.search
+        self.assertListEqual([0, 1, 2], search(Card('Thoughtseize')))
+        self.assertListEqual([0, 1], search(Card('THOUGHTSEIZE', count=4)))
+        self.assertListEqual([0, 2], search(Card('Tarmogoyf',
+                                                 section='Sideboard')))
+        self.assertListEqual([0, 1, 2], search(Card('Tarmogoyf',
+                                                    section=None)))
+        self.assertListEqual([1], search(Card('Tarmogoyf', count=2,
+                                              section=None) & Card('Island') |
+                                         Card('Tarmogoyf', count=4)))
+        self.assertListEqual([0], search(Card('Thoughtseize', count=4) &
+                                         Card('Tarmogoyf', section='side')))
+        self.assertListEqual([2, 3], search(~Card('Thoughtseize', count=4)))
+        self.assertListEqual([3], search(Card('Island') |
+                                         Card('Unknown')))
+        self.assertListEqual([], search(Card('Unknown')))
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as fout:
+            fout.write(b'garbage')
+        with self.assertRaises(ValueError):
+            DeckIndex(self.path)
+
+
+class TestQuery(TestCase):
+    def test_types(self):
+        with self.assertRaises(TypeError):
+            Query()  # pylint: disable=E0110
+        query = Card('a') | Card('b')
+        self.assertIsInstance(query, Or)
+        self.assertNotIsInstance(query, And)
+        self.assertNotIsInstance(Card('a') & Card('b'), Or)
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+from shutil import rmtree
+from unittest import TestCase
+from unittest.mock import patch
+
+from mtgdeck.encoder import MagicWorkstationEncoder
+from mtgdeck.job import (JOURNAL, Job)
+
+
+class TestJob(TestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.target = tempfile.mkdtemp()
+        self.inputs = []
+        for name, content in (('a.txt', '1 aname\n'),
+                              (os.path.join('sub', 'b.txt'), '2 bname\n'),
+                              ('c.txt', 'invalid'),
+                              ('d.txt', 'SB: 4 dname\n')):
+            path = os.path.join(self.source, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as fout:
+                fout.write(content)
+            self.inputs.append(path)
+
+    def tearDown(self):
+        rmtree(self.source)
+        rmtree(self.target)
+
+    def job(self):
+        return Job(self.inputs, self.target, self.source,
+                   encoder=MagicWorkstationEncoder, every=2)
+
+    def test_job(self):
+        with self.assertRaises(ValueError):
+            Job(self.inputs, self.target, self.source, every=0)
+        with self.assertRaises(ValueError):
+            Job(self.inputs, self.target, os.path.join(self.source, 'sub'))
+
+    def test_run_root(self):
+        self.assertEqual(4, self.job().run())
+        other = tempfile.mkdtemp(dir=self.source)
+        path = os.path.join(other, 'e.txt')
+        with open(path, 'w') as fout:
+            fout.write('5 ename\n')
+        self.inputs.append(path)
+        job = self.job()
+        self.assertListEqual([os.path.relpath(path, self.source)],
+                             list(job.pending()))
+        self.assertEqual(1, job.run())
+
+    def test_run_nested_target(self):
+        target = os.path.join(self.source, 'out')
+        for _ in range(2):
+            inputs = [os.path.join(root, name)
+                      for root, _, files in os.walk(self.source)
+                      for name in files]
+            job = Job(inputs, target, self.source,
+                      encoder=MagicWorkstationEncoder)
+            job.run()
+        self.assertListEqual(['c.txt'], list(job.journal['failed']))
+        self.assertFalse(os.path.exists(os.path.join(target, 'out')))
+
+    def test_run(self):
+        job = self.job()
+        self.assertEqual(4, job.run())
+        with open(os.path.join(self.target, 'sub', 'b.mwDeck')) as fin:
+            self.assertEqual('2 bname\n', fin.read())
+        with open(os.path.join(self.target, JOURNAL)) as fin:
+            journal = json.load(fin)
+        self.assertListEqual(['a.txt', 'd.txt', os.path.join('sub', 'b.txt')],
+                             sorted(journal['done']))
+        self.assertListEqual(['c.txt'], list(journal['failed']))
+        self.assertFalse(any(name.endswith('.tmp')
+                             for name in os.listdir(self.target)))
+
+        self.assertEqual(0, self.job().run())
+        os.remove(os.path.join(self.target, 'a.mwDeck'))
+        with open(os.path.join(self.target, 'd.mwDeck'), 'a') as fout:
+            fout.write('truncated')
+        job = self.job()
+        self.assertListEqual(['a.txt', 'd.txt'], list(job.pending()))
+        self.assertEqual(2, job.run())
+
+    def test_run_resume(self):
+        job = self.job()
+        convert = job.convert
+        calls = []
+
+        def crash(name):
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            calls.append(name)
+            return convert(name)
+
+        with patch.object(job, 'convert', crash):
+            with self.assertRaises(KeyboardInterrupt):
+                job.run()
+
+        job = self.job()
+        self.assertListEqual([os.path.join('sub', 'b.txt')],
+                             list(job.pending()))
+        self.assertEqual(1, job.run())
+        self.assertEqual(3, len(job.journal['done']))
@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+import re
+from mtgdeck.lazy import LazyDeck
+
+
+class TestLazyDeck(TestCase):
+    def setUp(self):
+        buffer = '4 mname\n2 [SETID] sname\n'
+        pattern = re.compile(r'(?P<count>\d+) (?:\[(?P<setid>\w+)\] )?'
+                             r'(?P<name>\w+)\n')
+        self.deck = LazyDeck(buffer)
+        for match, sideboard in zip(pattern.finditer(buffer), (0, 1)):
+            self.deck.append(match, sideboard)
+
+    def test_sequence(self):
+        expected = [('mname', {'count': 4}),
+                    ('sname', {'count': 2, 'setid': 'SETID',
+                               'section': 'Sideboard'})]
+        self.assertEqual(2, len(self.deck))
+        self.assertListEqual(expected, list(self.deck))
+        self.assertEqual(expected[-1], self.deck[-1])
+        self.assertListEqual(expected[1:], self.deck[1:])
+        self.assertEqual('<LazyDeck of 2 entries>', repr(self.deck))
+
+    def test_accessors(self):
+        self.assertEqual('sname', self.deck.name(1))
+        self.assertTrue(self.deck.is_sideboard(1))
+        self.assertListEqual([4, 2], list(self.deck.counts))
+
+    def test_total(self):
+        self.assertEqual(6, self.deck.total())
+        self.assertEqual(4, self.deck.total(sideboard=False))
+        self.assertEqual(2, self.deck.total(sideboard=True))
+
+    def test_append(self):
+        deck = LazyDeck('1 mname')
+        deck.append(re.match(r'(?P<count>\d+) (?P<name>\w+)', deck.buffer),
+                    False)
+        self.assertListEqual([('mname', {'count': 1})], list(deck))
@@ -0,0 +1,56 @@
+import io
+import pickle
+from unittest import TestCase
+
+from mtgdeck.legality import (FORMATS, Rules, Violation)
+
+
+def _deck(main, sideboard=()):
+    return ([(name, {'count': count}) for name, count in main] +
+            [(name, {'count': count, 'section': 'Sideboard'})
+             for name, count in sideboard])
+
+
+class TestRules(TestCase):
+    def setUp(self):
+        self.rules = Rules.load(io.StringIO(
+            '# vintage\n[banned]\nChaos Orb\n[Restricted]\n'
+            'Ancestral Recall  # blue\n\n[unlimited]\nRelentless Rats\n'),
+            **FORMATS['constructed'])
+
+    def test_check(self):
+        legal = _deck([('Island', 20), ('Relentless Rats', 39),
+                       ('Ancestral Recall', 1)], [('Duress', 4)])
+        self.assertListEqual([], self.rules.check(legal))
+
+        deck = _deck([('Island', 20), ('chaos orb', 1), ('Bolt', 3),
+                      ('Ancestral Recall', 1), ('Bolt', 1)],
+                     [('bolt', 1), ('Ancestral Recall', 1), ('Duress', 4),
+                      ('Relentless Rats', 10)])
+        deck.append(('Token', {'count': 9, 'section': 'tokens'}))
+        expected = [Violation('min_main', None, 26, 60),
+                    Violation('max_sideboard', None, 16, 15),
+                    Violation('banned', 'chaos orb', 1, 0),
+                    Violation('copies', 'Bolt', 5, 4),
+                    Violation('restricted', 'Ancestral Recall', 2, 1)]
+        self.assertListEqual(expected, self.rules.check(deck))
+
+        self.assertListEqual([[], [Violation('min_main', None, 59, 60)]],
+                             list(self.rules.check_many(
+                                 [legal, _deck([('Island', 59)])])))
+
+    def test_rules(self):
+        rules = Rules(min_main=40, max_main=40, max_sideboard=None,
+                      copies=None, banned=['Bolt'], unlimited=())
+        deck = _deck([('Island', 41)], [('Duress', 100), ('Bolt', 1)])
+        self.assertListEqual([Violation('max_main', None, 41, 40),
+                              Violation('banned', 'Bolt', 1, 0)],
+                             rules.check(deck))
+        self.assertListEqual(rules.check(deck),
+                             pickle.loads(pickle.dumps(rules)).check(deck))
+
+    def test_load(self):
+        with self.assertRaises(ValueError):
+            Rules.load(io.StringIO('Chaos Orb\n'))
+        with self.assertRaises(ValueError):
+            Rules.load(io.StringIO('[legal]\nChaos Orb\n'))
@@ -0,0 +1,83 @@
+import io
+import os
+import tarfile
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from mtgdeck.decoder import (AutoDecoder, CockatriceDecoder,
+                             MagicOnlineDecoder, MagicWorkstationDecoder)
+from mtgdeck.encoder import CompactEncoder
+from mtgdeck.members import (decoder_for, load_members, members,
+                             safe_name)
+
+MEMBERS = [('a/one.txt', b'1 mname\n'),
+           ('a/two.mwDeck', b'SB: 2 sname\n'),
+           ('three.cod', b'<cockatrice_deck><zone name="main">'
+                         b'<card number="3" name="cname"/>'
+                         b'</zone></cockatrice_deck>'),
+           ('four.dek', b'4 dname\n'),
+           ('five.mtgb', CompactEncoder().dumps([('bname', {'count': 5})])),
+           ('six.txt', b'invalid')]
+
+
+class TestMembers(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.zip = os.path.join(self.test_dir, 'decks.zip')
+        with zipfile.ZipFile(self.zip, 'w') as archive:
+            archive.writestr('a/', '')
+            for name, data in MEMBERS:
+                archive.writestr(name, data)
+
+        self.tar = os.path.join(self.test_dir, 'decks.tar.gz')
+        with tarfile.open(self.tar, 'w:gz') as archive:
+            for name, data in MEMBERS:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    def tearDown(self):
+        for name in os.listdir(self.test_dir):
+            os.remove(os.path.join(self.test_dir, name))
+        os.rmdir(self.test_dir)
+
+    def test_decoder_for(self):
+        self.assertIs(MagicOnlineDecoder, decoder_for('a/b.TXT'))
+        self.assertIs(MagicWorkstationDecoder, decoder_for('b.mwDeck'))
+        self.assertIs(CockatriceDecoder, decoder_for('b.cod'))
+        self.assertIs(AutoDecoder, decoder_for('b.dek'))
+
+    def test_safe_name(self):
+        self.assertEqual(os.path.join('a', 'b.txt'), safe_name('a/./b.txt'))
+        self.assertEqual('b.txt', safe_name('a/../b.txt'))
+        for name in ('../b.txt', 'a/../../b.txt', '/b.txt', 'C:/b.txt',
+                     '..\\b.txt', '.'):
+            with self.assertRaises(ValueError):
+                safe_name(name)
+
+    def test_members(self):
+        for path in (self.zip, self.tar):
+            self.assertListEqual(MEMBERS, list(members(path)))
+            self.assertListEqual(['a/one.txt', 'six.txt'],
+                                 [name for name, _ in members(path, '*.txt')])
+        with self.assertRaises(ValueError):
+            members(__file__)
+
+    def test_load_members(self):
+        expected = [('a/one.txt', [('mname', {'count': 1})]),
+                    ('a/two.mwDeck', [('sname', {'count': 2,
+                                                 'section': 'Sideboard'})]),
+                    ('three.cod', [('cname', {'count': 3,
+                                              'section': 'main'})]),
+                    ('four.dek', [('dname', {'count': 4})]),
+                    ('five.mtgb', [('bname', {'count': 5})])]
+        for path in (self.zip, self.tar):
+            actual = list(load_members(path, chunksize=2))
+            self.assertListEqual(expected, actual[:-1])
+            self.assertEqual('six.txt', actual[-1][0])
+            self.assertIsInstance(actual[-1][1], Exception)
+
+        actual = list(load_members(self.zip, cls=MagicOnlineDecoder,
+                                   pattern='*.dek', executor='thread'))
+        self.assertListEqual(expected[3:4], actual)
@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+from tempfile import mkdtemp
+from os import unlink, path, rmdir
+from mtgdeck.multideck import (HEADERS, load_decks, loads_decks, split)
+
+
+class TestSplit(TestCase):
+    def test_split(self):
+        string = ('// deck 1\n// by someone\n1 mname\n\n\n'
+                  '2 mname\nSideboard\n1 sname\n'
+                  '// deck 3\n3 mname\n  \n// trailing comment\n')
+        expected = [(0, 31), (34, 77)]
+        actual = list(split(string))
+        self.assertListEqual(expected, actual)
+        self.assertListEqual(actual, list(split(string.encode('ascii'))))
+
+        expected = [(0, 31), (34, 59), (60, 77)]
+        actual = list(split(string, HEADERS))
+        self.assertListEqual(expected, actual)
+        self.assertListEqual(actual, list(split(string.encode('ascii'),
+                                                HEADERS)))
+
+    def test_split_comments(self):
+        string = ('// Deck 1\n4 Bolt\n// Creatures\n4 Goyf\nSideboard\n'
+                  '// vs control\n2 Duress\n\n// Deck 2\n1 mname\n')
+        self.assertListEqual(
+            [[('Bolt', {'count': 4}), ('Goyf', {'count': 4}),
+              ('Duress', {'count': 2, 'section': 'Sideboard'})],
+             [('mname', {'count': 1})]],
+            [deck for _, deck in loads_decks(string, workers=1)])
+
+    def test_split_crlf(self):
+        string = '1 a\r\n1 b\r\n\r\n1 c\r\n// deck 3\r\n1 d\r\n'
+        self.assertListEqual([(0, 8), (12, 33)], list(split(string)))
+        self.assertListEqual([(0, 8), (12, 15), (17, 33)],
+                             list(split(string, HEADERS)))
+        self.assertListEqual([[('a', {'count': 1}), ('b', {'count': 1})],
+                              [('c', {'count': 1})], [('d', {'count': 1})]],
+                             [deck for _, deck in loads_decks(
+                                 string, separator=HEADERS, workers=1)])
+
+    def test_split_custom(self):
+        self.assertListEqual([(0, 7), (10, 17)],
+                             list(split('1 mname---1 sname', '---')))
+        self.assertListEqual([], list(split('\n\n// nothing\n')))
+
+
+class TestLoadDecks(TestCase):
+    def setUp(self):
+        self.test_dir = mkdtemp()
+        self.test_input_file = path.join(self.test_dir, 'input.txt')
+        self.string = ''.join('// deck {}\n{} mname\nSideboard\n1 sname\n\n'
+                              .format(i, i) for i in range(1, 101))
+        with open(self.test_input_file, 'w') as fp:
+            fp.write(self.string)
+
+    def tearDown(self):
+        unlink(self.test_input_file)
+        rmdir(self.test_dir)
+
+    def assertDecks(self, decks):
+        self.assertEqual(100, len(decks))
+        for i, (offset, deck) in enumerate(decks, 1):
+            self.assertTrue(self.string.startswith('// deck {}\n'.format(i),
+                                                   offset))
+            self.assertListEqual(
+                [('mname', {'count': i}),
+                 ('sname', {'count': 1, 'section': 'Sideboard'})], deck)
+
+    def test_loads_decks(self):
+        for workers in (1, 2):
+            self.assertDecks(loads_decks(self.string, workers=workers,
+                                         chunksize=8))
+
+    def test_load_decks(self):
+        for workers in (1, 2):
+            self.assertDecks(load_decks(self.test_input_file,
+                                        workers=workers, chunksize=8))
+
+        open(self.test_input_file, 'w').close()
+        self.assertListEqual([], load_decks(self.test_input_file))
@@ -0,0 +1,69 @@
+from unittest import TestCase
+from io import StringIO
+
+from mtgdeck.names import (NameIndex, distance, resolve)
+
+
+class TestDistance(TestCase):
+    def test_distance(self):
+        self.assertEqual(0, distance('bolt', 'bolt'))
+        self.assertEqual(1, distance('bolt', 'bold'))
+        self.assertEqual(3, distance('', 'abc'))
+        self.assertEqual(1, distance('Lightening Bolt', 'Lightning Bolt'))
+
+
+class TestNameIndex(TestCase):
+    def setUp(self):
+        self.index = NameIndex(['Lightning Bolt', 'Lightning Helix',
+                                'Counterspell', 'Tarmogoyf', 'Thoughtseize',
+                                'Lightning Bolt'])
+
+    def test_add(self):
+        self.assertEqual(5, len(self.index))
+        self.assertIn('lightning bolt', self.index)
+        self.assertNotIn('Mountain', self.index)
+
+    def test_search(self):
+        expected = [(1, 'Lightning Bolt')]
+        actual = self.index.search('Lightening Bolt')
+        self.assertListEqual(expected, actual)
+        self.assertListEqual([], NameIndex().search('anything'))
+
+    def test_suggest(self):
+        expected = ['Lightning Bolt', 'Lightning Helix']
+        actual = self.index.suggest('Lightning Hole', tolerance=5)
+        self.assertListEqual(expected, actual)
+
+    def test_resolve(self):
+        self.assertEqual('Tarmogoyf', self.index.resolve('tarmogoyf'))
+        self.assertEqual('Counterspell', self.index.resolve('Conterspell'))
+        self.assertEqual(None, self.index.resolve('Mountain'))
+
+    def test_resolve_cache(self):
+        index = NameIndex(['Tarmogoyf', 'Counterspell'], cache_size=1)
+        index.resolve('Tarmagoyf')
+        index.resolve('Tarmagoyf')
+        index.resolve('Conterspell')
+        self.assertListEqual(['Conterspell'], list(index._cache))
+
+    def test_dump_load(self):
+        fp = StringIO()
+        self.index.dump(fp)
+        fp.seek(0)
+        index = NameIndex.load(fp)
+
+        self.assertEqual(len(self.index), len(index))
+        self.assertEqual(self.index.tolerance, index.tolerance)
+        for name in ('Lightening Bolt', 'thoughtsieze', 'Mountain'):
+            self.assertEqual(self.index.resolve(name), index.resolve(name))
+
+
+class TestResolve(TestCase):
+    def test_resolve(self):
+        index = NameIndex(['Lightning Bolt'])
+        obj = [('Lightening Bolt', {'count': 4}),
+               ('Mountain', {'count': 20})]
+        expected = [('Lightning Bolt', {'count': 4}),
+                    ('Mountain', {'count': 20})]
+        actual = list(resolve(obj, index))
+        self.assertListEqual(expected, actual)
@@ -0,0 +1,79 @@
+from unittest import TestCase
+
+from mtgdeck.normalize import (main_first, normalize, sections)
+
+
+class TestSections(TestCase):
+    def setUp(self):
+        self.obj = [('b', {'count': 1, 'section': 'Sideboard'}),
+                    ('m', {'count': 2}),
+                    ('B', {'count': 1, 'section': 'Maybe'}),
+                    ('m', {'count': 1, 'setid': 'X'}),
+                    ('m', {'count': 2}),
+                    ('a', {'count': 3, 'section': 'Sideboard'})]
+
+    def test_sections(self):
+        expected = [(None, [('m', {'count': 4}),
+                            ('m', {'count': 1, 'setid': 'X'})]),
+                    ('Sideboard', [('b', {'count': 1, 'section': 'Sideboard'}),
+                                   ('a', {'count': 3,
+                                          'section': 'Sideboard'})]),
+                    ('Maybe', [('B', {'count': 1, 'section': 'Maybe'})])]
+        actual = list(sections(self.obj))
+        self.assertListEqual(expected, actual)
+        self.assertDictEqual({'count': 2}, self.obj[1][1])
+
+    def test_sections_nomerge(self):
+        actual = list(sections(self.obj, merge=False))
+        self.assertListEqual([None, 'Sideboard', 'Maybe'],
+                             [section for section, _ in actual])
+        self.assertEqual(3, len(actual[0][1]))
+
+    def test_sections_sort(self):
+        actual = list(sections(self.obj, sort=True))
+        self.assertListEqual([None, 'Maybe', 'Sideboard'],
+                             [section for section, _ in actual])
+        self.assertListEqual(['a', 'b'],
+                             [name for name, _ in actual[2][1]])
+
+    def test_sections_main(self):
+        obj = [('s', {'count': 1, 'section': 'side'}),
+               ('m', {'count': 1, 'section': 'Main'}),
+               ('n', {'count': 1})]
+        actual = list(sections(obj))
+        self.assertListEqual([None, 'side'],
+                             [section for section, _ in actual])
+        self.assertListEqual(['m', 'n'], [name for name, _ in actual[0][1]])
+
+    def test_sections_empty(self):
+        self.assertListEqual([], list(sections([])))
+
+
+class TestNormalize(TestCase):
+    def test_normalize(self):
+        obj = [('s', {'count': 1, 'section': 'Sideboard'}),
+               ('m', {'count': 1}),
+               ('s', {'count': 1, 'section': 'Sideboard'})]
+        expected = [('m', {'count': 1}),
+                    ('s', {'count': 2, 'section': 'Sideboard'})]
+        actual = list(normalize(obj))
+        self.assertListEqual(expected, actual)
+
+
+class TestMainFirst(TestCase):
+    def test_main_first(self):
+        consumed = []
+
+        def entries():
+            for entry in [('s', {'count': 1, 'section': 'Sideboard'}),
+                          ('m', {'count': 1, 'section': 'main'}),
+                          ('x', {'count': 1, 'section': 'Maybe'}),
+                          ('t', {'count': 1, 'section': 'Sideboard'}),
+                          ('n', {'count': 1})]:
+                consumed.append(entry[0])
+                yield entry
+        actual = main_first(entries())
+        self.assertEqual('m', next(actual)[0])
+        self.assertListEqual(['s', 'm'], consumed)
+        self.assertListEqual(['n', 's', 't', 'x'],
+                             [name for name, _ in actual])
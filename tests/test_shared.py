@@ -0,0 +1,102 @@
+import subprocess
+import sys
+from unittest import (TestCase, skipUnless)
+
+from mtgdeck.decoder import DecodeError
+from mtgdeck.shared import (AVAILABLE, SharedDecks, SharedMemory,
+                            map_loads_shared, pack)
+
+
+@skipUnless(AVAILABLE, 'Shared memory needs Python 3.8')
+class TestSharedDecks(TestCase):
+    def setUp(self):
+        self.decks = [[('mname', {'count': 2}),
+                       ('sname', {'count': 1, 'section': 'Sideboard',
+                                  'setid': 'ABC'})],
+                      [],
+                      [('sname', {'count': 4, 'section': 'Sideboard'}),
+                       ('Ærtherling', {'count': 3})]]
+
+    def test_pack(self):
+        name = pack(self.decks)
+        with SharedDecks(name) as decks:
+            self.assertEqual(3, len(decks))
+            self.assertListEqual(self.decks, list(decks))
+            self.assertListEqual(self.decks[-1], decks[-1])
+            self.assertListEqual(self.decks[:2], decks[:2])
+            self.assertListEqual([0, 2, 2, 4], list(decks.offsets))
+            self.assertListEqual([2, 1, 4, 3], list(decks.counts))
+            self.assertListEqual([0, 3, 3, 0], list(decks.sections))
+        decks.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name)
+
+    def test_pack_empty(self):
+        with SharedDecks(pack([])) as decks:
+            self.assertEqual(0, len(decks))
+
+    def test_owner(self):
+        name = pack(self.decks)
+        with SharedDecks(name, owner=False) as decks:
+            self.assertListEqual(self.decks[0], decks[0])
+        with SharedDecks(name) as decks:
+            self.assertListEqual(self.decks[0], decks[0])
+
+    def test_owner_exit(self):
+        name = pack(self.decks)
+        try:
+            result = subprocess.run(
+                [sys.executable, '-c',
+                 'import sys; from mtgdeck.shared import SharedDecks; '
+                 'SharedDecks(sys.argv[1], owner=False)', name],
+                stderr=subprocess.PIPE, check=True)
+            self.assertNotIn(b'leaked', result.stderr)
+        finally:
+            with SharedDecks(name) as decks:
+                self.assertListEqual(self.decks, list(decks))
+
+    def test_invalid(self):
+        block = SharedMemory(create=True, size=64)
+        try:
+            with self.assertRaises(ValueError):
+                SharedDecks(block.name)
+        finally:
+            block.close()
+            block.unlink()
+
+
+@skipUnless(AVAILABLE, 'Shared memory needs Python 3.8')
+class TestMapLoadsShared(TestCase):
+    def test_map_loads_shared(self):
+        strings = ['{} mname\n'.format(i) for i in range(10)] + ['invalid']
+        actual = []
+        for block in map_loads_shared(strings, workers=2, chunksize=4):
+            with block:
+                actual.extend(block)
+                errors = block.errors
+        self.assertListEqual([[('mname', {'count': i})] for i in range(10)],
+                             actual[:10])
+        self.assertListEqual([], actual[10])
+        self.assertIsInstance(errors[2], DecodeError)
+
+        blocks = map_loads_shared(strings, workers=2, chunksize=4)
+        with next(blocks) as block:
+            self.assertEqual(4, len(block))
+        blocks.close()
+
+    def test_map_loads_shared_window(self):
+        consumed = []
+
+        def strings():
+            for i in range(1, 100):
+                consumed.append(i)
+                yield '{} mname\n'.format(i)
+        blocks = map_loads_shared(strings(), workers=1, chunksize=2,
+                                  window=3)
+        with next(blocks) as block:
+            self.assertEqual(2, len(block))
+        self.assertLessEqual(len(consumed), 8)
+        blocks.close()
+
+        with self.assertRaises(ValueError):
+            map_loads_shared([], window=0)
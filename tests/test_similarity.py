@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+from mtgdeck.similarity import (LSHIndex, MinHash, similarity, tokens)
+
+
+def _deck(names, count=4):
+    return [(name, {'count': count}) for name in names]
+
+
+class TestTokens(TestCase):
+    def test_tokens(self):
+        obj = [('Bolt', {'count': 1}), ('bolt', {'count': 1}),
+               ('Bolt', {'count': 1, 'section': 'Sideboard'})]
+        expected = ['\tbolt\t0', '\tbolt\t1', 'sideboard\tbolt\t0']
+        self.assertCountEqual(expected, list(tokens(obj)))
+
+
+class TestMinHash(TestCase):
+    def test_signature(self):
+        minhash = MinHash(permutations=256)
+        deck = _deck('abcdefghij')
+        signature = minhash.signature(deck)
+        self.assertEqual(256, len(signature))
+        self.assertEqual(signature, minhash.signature(reversed(deck)))
+        self.assertEqual(signature, MinHash(permutations=256).signature(deck))
+        self.assertNotEqual(signature,
+                            MinHash(permutations=256, seed=2).signature(deck))
+
+        self.assertEqual(1.0, similarity(signature, signature))
+        half = minhash.signature(_deck('abcdefghij', count=2))
+        self.assertAlmostEqual(0.5, similarity(signature, half), delta=0.1)
+        other = minhash.signature(_deck('klmnopqrst'))
+        self.assertLess(similarity(signature, other), 0.1)
+        self.assertEqual(0.0, similarity(signature, minhash.signature([])))
+
+
+class TestLSHIndex(TestCase):
+    def setUp(self):
+        self.index = LSHIndex(bands=32)
+        self.decks = {'burn': _deck('abcdefghijklmno'),
+                      'burn2': _deck('abcdefghijklmnp'),
+                      'control': _deck('0123456789+-*/='),
+                      'control2': _deck('0123456789+-*/%')}
+        for key, deck in self.decks.items():
+            self.index.add(key, deck)
+
+    def test_add(self):
+        self.assertEqual(4, len(self.index))
+        with self.assertRaises(KeyError):
+            self.index.add('burn', [])
+        with self.assertRaises(ValueError):
+            LSHIndex(bands=30)
+
+    def test_query(self):
+        actual = self.index.query(self.decks['burn'], limit=2)
+        self.assertListEqual(['burn', 'burn2'], [key for _, key in actual])
+        self.assertEqual(1.0, actual[0][0])
+        self.assertListEqual(
+            [], self.index.query(_deck('vwxyz'), threshold=0.5))
+
+    def test_pairs(self):
+        actual = {(left, right) for left, right, _ in
+                  self.index.pairs(threshold=0.5)}
+        self.assertSetEqual({('burn', 'burn2'), ('control', 'control2')},
+                            actual)
@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import tempfile
+from unittest import TestCase
+
+from mtgdeck.encoder import OCTGNEncoder
+from mtgdeck.sqlite import (Importer, export_files, import_files, select)
+
+
+class TestImporter(TestCase):
+    def setUp(self):
+        self.con = sqlite3.connect(':memory:')
+        self.decks = [('a', [('m', {'count': 2}),
+                             ('s', {'count': 1, 'section': 'Sideboard',
+                                    'setid': 'X'})]),
+                      ('b', [('s', {'count': 4}), ('m', {'count': 1})]),
+                      ('c', [])]
+
+    def tearDown(self):
+        self.con.close()
+
+    def test_insert(self):
+        self.assertListEqual([1, 2, 3],
+                             Importer(self.con, size=2).insert(self.decks))
+        self.assertListEqual([4], Importer(self.con).insert(self.decks[:1]))
+
+        actual = list(select(self.con))
+        self.assertListEqual([(1, 'a', self.decks[0][1]),
+                              (2, 'b', self.decks[1][1]),
+                              (3, 'c', []),
+                              (4, 'a', self.decks[0][1])], actual)
+        self.assertEqual(2, self.con.execute(
+            'SELECT COUNT(*) FROM card').fetchone()[0])
+
+    def test_insert_rollback(self):
+        importer = Importer(self.con)
+        with self.assertRaises(KeyError):
+            importer.insert([('a', [('m', {'count': 1}), ('n', {})])])
+        self.assertDictEqual({}, importer.cards)
+        self.assertListEqual([1], importer.insert(self.decks[:1]))
+        self.assertListEqual([(1, 'a', self.decks[0][1])],
+                             list(select(self.con)))
+
+
+class TestFiles(TestCase):
+    def test_files(self):
+        con = sqlite3.connect(':memory:')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'deck.txt')
+            with open(path, 'w') as fout:
+                fout.write('2 mname\nSideboard\n1 sname\n')
+            self.assertListEqual([1, 2], import_files(con, [path, path]))
+            Importer(con).insert([(None, [('xname', {'count': 3})])])
+
+            actual = export_files(con, directory, cls=OCTGNEncoder)
+            self.assertListEqual([os.path.join(directory, name)
+                                  for name in ('1-deck.o8d', '2-deck.o8d',
+                                               '3.o8d')], actual)
+            with open(actual[0]) as fin:
+                self.assertIn('>sname<', fin.read())
+            with open(actual[2]) as fin:
+                self.assertIn('>xname<', fin.read())
+        con.close()
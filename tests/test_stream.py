@@ -0,0 +1,73 @@
+import io
+from unittest import TestCase
+
+from mtgdeck.__main__ import ENCODECS
+from mtgdeck.stream import (FrameError, Server)
+
+
+def _request(decoder, encoder, payload):
+    return '{} {} {}\n'.format(decoder, encoder,
+                               len(payload)).encode('ascii') + payload
+
+
+def _responses(data):
+    fin = io.BytesIO(data)
+    responses = []
+    for header in iter(fin.readline, b''):
+        status, length = header.split()
+        responses.append((status.decode('ascii'), fin.read(int(length))))
+    return responses
+
+
+class TestServer(TestCase):
+    def setUp(self):
+        self.server = Server(ENCODECS['decoder'], ENCODECS['encoder'])
+
+    def test_serve(self):
+        fin = io.BytesIO(_request('auto', 'bin', b'1 mname\n') +
+                         _request('text', 'cod', b'1 mname\n') +
+                         _request('text', 'text', b'invalid') +
+                         _request('nope', 'text', b'') +
+                         _request('default', 'mws', b'SB: 2 x\n'))
+        fout = io.BytesIO()
+        self.assertEqual(5, self.server.serve(fin, fout))
+
+        responses = _responses(fout.getvalue())
+        self.assertListEqual(['ok', 'ok', 'error', 'error', 'ok'],
+                             [status for status, _ in responses])
+        self.assertTrue(responses[0][1].startswith(b'MTGB'))
+        self.assertIn(b'name="mname"', responses[1][1])
+        self.assertIn(b'Unknown decoder', responses[3][1])
+        self.assertEqual(b'SB: 2 x\n', responses[4][1])
+        self.assertCountEqual(['auto', 'text', 'default'],
+                              self.server.codecs['decoder'])
+
+        fin = io.BytesIO(_request('bin', 'text', responses[0][1]))
+        fout = io.BytesIO()
+        self.server.serve(fin, fout)
+        self.assertListEqual([('ok', b'1 mname\n')],
+                             _responses(fout.getvalue()))
+
+    def test_serve_frame(self):
+        fout = io.BytesIO()
+        fin = io.BytesIO(_request('text', 'text', b'1 mname\n') +
+                         b'garbage\n' + _request('text', 'text', b''))
+        self.assertEqual(1, self.server.serve(fin, fout))
+        self.assertEqual('error', _responses(fout.getvalue())[-1][0])
+
+        with self.assertRaises(FrameError):
+            Server.request(io.BytesIO(b'text text 10\n1 mname\n'))
+
+    def test_request_limits(self):
+        for header in (b'text text -1\n', b'text text 67108865\n',
+                       b'text text ' + b'0' * 1024 + b'\n'):
+            with self.assertRaises(FrameError):
+                Server.request(io.BytesIO(header + b'1 mname\n'))
+        self.assertEqual(('text', 'text', b''),
+                         Server.request(io.BytesIO(b'text text 0\n')))
+
+    def test_codec(self):
+        codec = self.server.codec('encoder', 'text')
+        self.assertIs(codec, self.server.codec('encoder', 'text'))
+        with self.assertRaises(KeyError):
+            self.server.codec('encoder', 'auto')
@@ -0,0 +1,113 @@
+from unittest import TestCase
+
+from os import path, makedirs, utime, unlink
+from shutil import rmtree
+from tempfile import mkdtemp
+from mtgdeck.encoder import OCTGNEncoder
+from mtgdeck.watch import (MANIFEST, Watcher)
+
+
+class TestWatcher(TestCase):
+    def setUp(self):
+        self.test_dir = mkdtemp()
+        self.source = path.join(self.test_dir, 'source')
+        self.target = path.join(self.test_dir, 'target')
+        makedirs(path.join(self.source, 'sub'))
+        self.write('a.txt', '1 mname\n')
+        self.write(path.join('sub', 'b.txt'), '2 mname\n')
+        self.watcher = Watcher(self.source, self.target,
+                               encoder=OCTGNEncoder)
+        self.converted = []
+        convert = self.watcher.convert
+
+        def _convert(name, data):
+            self.converted.append(name)
+            return convert(name, data)
+
+        self.watcher.convert = _convert
+
+    def tearDown(self):
+        rmtree(self.test_dir)
+
+    def write(self, name, string):
+        with open(path.join(self.source, name), 'w') as fp:
+            fp.write(string)
+
+    def read(self, name):
+        with open(path.join(self.target, name)) as fp:
+            return fp.read()
+
+    def test_sync(self):
+        self.assertListEqual([], self.watcher.sync())
+        self.assertCountEqual(['a.txt', path.join('sub', 'b.txt')],
+                              self.converted)
+        self.assertIn('>mname<', self.read(path.join('sub', 'b.o8d')))
+        self.assertTrue(path.exists(path.join(self.target, MANIFEST)))
+
+        del self.converted[:]
+        self.watcher.sync()
+        self.assertListEqual([], self.converted)
+
+        # touched, but unchanged
+        utime(path.join(self.source, 'a.txt'), ns=(0, 0))
+        self.watcher.sync()
+        self.assertListEqual([], self.converted)
+
+        self.write('a.txt', '3 mname\n')
+        unlink(path.join(self.target, 'sub', 'b.o8d'))
+        self.watcher.sync()
+        self.assertCountEqual(['a.txt', path.join('sub', 'b.txt')],
+                              self.converted)
+        self.assertIn('qty="3"', self.read('a.o8d'))
+
+    def test_manifest(self):
+        self.watcher.sync()
+        unlink(path.join(self.source, 'a.txt'))
+        self.watcher.sync()
+
+        watcher = Watcher(self.source, self.target, encoder=OCTGNEncoder)
+        self.assertListEqual([path.join('sub', 'b.txt')],
+                             list(watcher.manifest))
+        self.assertFalse(path.exists(path.join(self.target, 'a.o8d')))
+
+    def test_failures(self):
+        self.write('c.txt', 'invalid')
+        failures = self.watcher.sync()
+        self.assertListEqual(['c.txt'], [name for name, _ in failures])
+        self.assertListEqual([], self.watcher.sync())
+
+        self.write('a.txt', 'invalid too')
+        self.assertListEqual(['a.txt'],
+                             [name for name, _ in self.watcher.sync()])
+        self.assertFalse(path.exists(path.join(self.target, 'a.o8d')))
+        self.assertListEqual([], self.watcher.sync())
+        self.write('a.txt', '1 mname\n')
+        self.assertListEqual([], self.watcher.sync())
+        self.assertIn('>mname<', self.read('a.o8d'))
+
+    def test_collisions(self):
+        self.write('a.dek', '5 mname\n')
+        failures = self.watcher.sync()
+        self.assertListEqual(['a.txt'], [name for name, _ in failures])
+        self.assertIn('a.dek', failures[0][1])
+        self.assertIn('qty="5"', self.read('a.o8d'))
+
+        unlink(path.join(self.source, 'a.dek'))
+        self.assertListEqual([], self.watcher.sync())
+        self.assertIn('qty="1"', self.read('a.o8d'))
+
+    def test_nested_target(self):
+        target = path.join(self.source, 'out')
+        watcher = Watcher(self.source, target, encoder=OCTGNEncoder)
+        self.write('c.tmp', '1 mname\n')
+        self.write(MANIFEST, '{}')
+        for _ in range(3):
+            self.assertListEqual([], watcher.sync())
+        self.assertListEqual(['a.txt', path.join('sub', 'b.txt')],
+                             sorted(watcher.manifest))
+        self.assertFalse(path.exists(path.join(target, 'out')))
+
+    def test_watch(self):
+        actual = list(self.watcher.watch(interval=0, count=2))
+        self.assertListEqual([[], []], actual)
+        self.assertEqual(2, len(self.converted))